@@ -0,0 +1,197 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from solver import HEURISTICAS, Dados, Modelo, Heuristica, ControleBusca
+from solver.instancia import carregar_instancia, gerar_instancia
+
+INSTANCIAS = re.compile(r"^(exp08_\d+|exp10_\d+|exp12_\d+|exp_30_01)\.json$")
+
+def carregar_instancias(pasta="data") -> list[tuple[str, Dados]]:
+    instancias = []
+    for arquivo in sorted(os.listdir(pasta)):
+        if INSTANCIAS.match(arquivo):
+            instancias.append((arquivo, carregar_instancia(os.path.join(pasta, arquivo))))
+    return instancias
+
+def gerar_instancias_escala(tamanhos: list[int], semente: int) -> list[tuple[str, Dados]]:
+    """Instâncias sintéticas com 'nL' lotes para cada tamanho, mantendo as proporções de exp_30_01 (cerca de 5 lotes por talhão,
+    6 lotes por veículo e 2 talhões por empilhadeira)."""
+    instancias = []
+    for nL in tamanhos:
+        nT = max(1, nL // 5)
+        nV = max(2, nL // 6)
+        nE = max(1, nT // 2)
+        instancias.append((f"sintetica_{nL}", gerar_instancia(nL, nT, nV, nE, semente=semente)))
+    return instancias
+
+def carregar_melhores_conhecidos(nome_arquivo="resultados.json") -> dict[str, float]:
+    """Melhor makespan de cada instância registrado nos resultados dos experimentos."""
+    try:
+        with open(nome_arquivo, "r", encoding="utf-8") as f:
+            resultados = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return {arquivo: min(min(r["solucoes"]) for r in heuristicas.values()) for arquivo, heuristicas in resultados.items()}
+
+def medir_vazao(funcao, duracao: float) -> float:
+    """Executa 'funcao' repetidamente por 'duracao' segundos e retorna o total de execuções por segundo."""
+    execucoes = 0
+    inicio = time.perf_counter()
+    while True:
+        funcao()
+        execucoes += 1
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= duracao:
+            return execucoes / decorrido
+
+def verificar_vizinhanca(modelo: Modelo, solucao, movimentos) -> int:
+    """Total de movimentos cujo makespan avaliado em lote por 'avaliar_vizinhanca' difere do avaliado isoladamente por 'avaliar_movimentos'."""
+    em_lote = modelo.avaliar_vizinhanca(solucao, movimentos)
+    return sum(not math.isclose(M, modelo.avaliar_movimentos(solucao, [tuple(movimento)]), rel_tol=1e-9, abs_tol=1e-9)
+               for M, movimento in zip(em_lote.tolist(), movimentos.tolist()))
+
+def benchmark_micro(dados: Dados, semente: int, duracao: float) -> dict[str, float]:
+    """Vazão das operações do modelo: soluções aleatórias, vizinhos e avaliações por segundo. Também conta os movimentos em que a
+    avaliação em lote diverge da isolada ('divergencias_vizinhanca', que deve ser 0)."""
+    modelo = Modelo(dados, random.Random(semente))
+    solucao = modelo.gera_solucao_aleatoria()
+    # A prioridade (tempos H da solução) faz o decodificador reproduzir o cronograma da solução, em vez de encerrar cedo com math.inf
+    lotes, inicio_veiculo, empilhadeira_talhao, prioridade = modelo.codificar(solucao)
+    M = modelo.avaliar(lotes, inicio_veiculo, empilhadeira_talhao, prioridade)
+    assert math.isfinite(M) and math.isclose(M, solucao.M), f"decodificador retornou {M} para a solução de makespan {solucao.M}"
+    movimentos = modelo.listar_movimentos(solucao, maximo=2000)
+
+    resultados = {
+        "solucoes_aleatorias_s": medir_vazao(modelo.gera_solucao_aleatoria, duracao),
+        "vizinhos_s": medir_vazao(lambda: modelo.gera_solucao_vizinha(solucao), duracao),
+        "avaliacoes_delta_s": medir_vazao(lambda: modelo.gera_movimento_vizinho(solucao), duracao),
+        "avaliacoes_decodificador_s": medir_vazao(lambda: modelo.avaliar(lotes, inicio_veiculo, empilhadeira_talhao, prioridade), duracao),
+    }
+    if len(movimentos) > 0:
+        resultados["divergencias_vizinhanca"] = verificar_vizinhanca(modelo, solucao, movimentos)
+        resultados["avaliacoes_lote_s"] = len(movimentos) * medir_vazao(lambda: modelo.avaliar_vizinhanca(solucao, movimentos), duracao)
+    return resultados
+
+def benchmark_macro(dados: Dados, semente: int, alvo: float, tempo_limite: float, max_exec: int = 2000) -> dict[str, dict]:
+    """Tempo até cada heurística alcançar o makespan 'alvo' (None caso não alcance dentro do tempo limite ou de 'max_exec' iterações).
+    O 'max_exec' define o horizonte do resfriamento e o reaquecimento do simulated annealing, e deve ser o mesmo das execuções reais."""
+    resultados = {}
+    for nome_heuristica in HEURISTICAS:
+        heuristica = Heuristica(Modelo(dados, random.Random(f"{semente}:{nome_heuristica}")))
+        inicio = time.perf_counter()
+        tempo_alvo = None
+
+        def ao_melhorar(solucao, iteracoes):
+            nonlocal tempo_alvo
+            if tempo_alvo is None and solucao.M <= alvo:
+                tempo_alvo = time.perf_counter() - inicio
+                controle.cancelar()
+
+        controle = ControleBusca(tempo_limite=tempo_limite, ao_melhorar=ao_melhorar)
+        solucao, iteracoes, _ = getattr(heuristica, nome_heuristica)(max_exec=max_exec, controle=controle)
+        resultados[nome_heuristica] = {"tempo_alvo": tempo_alvo, "makespan": solucao.M, "iteracoes": iteracoes}
+    return resultados
+
+def executar_benchmark(instancias: list[tuple[str, Dados]], baseline: dict, semente=0, duracao=0.5, tempo_limite=5.0, folga=0.02,
+                       max_exec=2000) -> dict[str, dict]:
+    melhores_conhecidos = carregar_melhores_conhecidos()
+    resultados = {}
+    for arquivo, dados in instancias:
+        print(f"Benchmark {arquivo}")
+        # O alvo fica registrado no baseline para que todas as execuções persigam o mesmo valor
+        alvo = baseline.get(arquivo, {}).get("alvo")
+        if alvo is None:
+            melhor = melhores_conhecidos.get(arquivo)
+            if melhor is None:
+                melhor = min(r["makespan"] for r in benchmark_macro(dados, semente, 0.0, tempo_limite, max_exec).values())
+            alvo = melhor * (1 + folga)
+
+        resultados[arquivo] = {
+            "alvo": alvo,
+            "micro": benchmark_micro(dados, semente, duracao),
+            "macro": benchmark_macro(dados, semente, alvo, tempo_limite, max_exec),
+        }
+    return resultados
+
+def comparar(resultados: dict[str, dict], baseline: dict[str, dict], tolerancia: float) -> list[str]:
+    """Compara os resultados com o baseline e retorna as regressões: vazões abaixo de (1 - tolerancia) vezes a do baseline,
+    tempos até o alvo acima de (1 + tolerancia) vezes o do baseline, alvos que deixaram de ser alcançados e divergências entre a
+    avaliação em lote e a isolada dos movimentos."""
+    regressoes = []
+    for arquivo, resultado in resultados.items():
+        # A avaliação em lote deve reproduzir a avaliação isolada de cada movimento, com ou sem baseline
+        if resultado["micro"].get("divergencias_vizinhanca", 0) > 0:
+            regressoes.append(f"{arquivo} avaliar_vizinhanca: {resultado['micro']['divergencias_vizinhanca']} movimentos divergem de avaliar_movimentos")
+        if arquivo not in baseline:
+            continue
+        for metrica, valor in resultado["micro"].items():
+            if metrica == "divergencias_vizinhanca":
+                continue
+            referencia = baseline[arquivo]["micro"].get(metrica)
+            if referencia is not None and valor < (1 - tolerancia) * referencia:
+                regressoes.append(f"{arquivo} {metrica}: {valor:.1f} < {referencia:.1f}")
+        for nome_heuristica, macro in resultado["macro"].items():
+            referencia = baseline[arquivo]["macro"].get(nome_heuristica, {}).get("tempo_alvo")
+            if referencia is None:
+                continue
+            if macro["tempo_alvo"] is None:
+                regressoes.append(f"{arquivo} {nome_heuristica}: alvo não alcançado (baseline {referencia:.3f}s)")
+            elif macro["tempo_alvo"] > (1 + tolerancia) * referencia:
+                regressoes.append(f"{arquivo} {nome_heuristica}: tempo até o alvo {macro['tempo_alvo']:.3f}s > {referencia:.3f}s")
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão e tempo até o alvo sobre as instâncias de data/.")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="Arquivo com os resultados de referência.")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como o novo baseline.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Variação relativa tolerada antes de apontar uma regressão.")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--duracao", type=float, default=0.5, help="Segundos de medição de cada vazão.")
+    parser.add_argument("--tempo-limite", type=float, default=5.0, help="Segundos máximos de cada heurística até o alvo.")
+    parser.add_argument("--max-exec", type=int, default=2000, help="Iterações máximas de cada heurística até o alvo.")
+    parser.add_argument("--instancias", default=None, help="Expressão regular para filtrar as instâncias.")
+    parser.add_argument("--escala", default=None, help="Tamanhos (lotes), separados por vírgula, de instâncias sintéticas usadas no lugar das de data/.")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.escala is not None:
+        instancias = gerar_instancias_escala([int(nL) for nL in args.escala.split(",")], args.semente)
+    else:
+        instancias = carregar_instancias()
+    if args.instancias is not None:
+        instancias = [(arquivo, dados) for arquivo, dados in instancias if re.search(args.instancias, arquivo)]
+
+    resultados = executar_benchmark(instancias, baseline, args.semente, args.duracao, args.tempo_limite, max_exec=args.max_exec)
+
+    print('')
+    for arquivo, resultado in resultados.items():
+        print(f"###### {arquivo} (alvo {resultado['alvo']:.3f}) ######")
+        for metrica, valor in resultado["micro"].items():
+            print(f"  {metrica}: {valor:.1f}")
+        for nome_heuristica, macro in resultado["macro"].items():
+            tempo_alvo = "não alcançado" if macro["tempo_alvo"] is None else f"{macro['tempo_alvo']:.3f}s"
+            print(f"  {nome_heuristica}: tempo até o alvo {tempo_alvo}, makespan {macro['makespan']:.3f}")
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **resultados}, f, ensure_ascii=False, indent=4)
+        print(f"Baseline salvo em {args.baseline}")
+        return
+
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+    for regressao in regressoes:
+        print(f"REGRESSÃO {regressao}")
+    if regressoes:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,84 @@
+from __future__ import annotations
+import argparse
 import json
 import os
+import random
+import re
 import time
-import numpy as np
-import gspread
-import pandas as pd
-from google.oauth2.service_account import Credentials
-from solver import Dados, Modelo, Heuristica
-
-def carregar_dados() -> list[tuple[str, Dados]]:
-    pasta = "data"
-    arquivos_json = [f for f in os.listdir(pasta) if f.endswith(".json")]
+from typing import TYPE_CHECKING
+
+# O solver (e com ele o numpy) e as dependências de cada subcomando são importados apenas quando usados, de forma que
+# importar este módulo seja rápido. A linha de comando importa o solver ao ser montada, pela lista de heurísticas (HEURISTICAS)
+if TYPE_CHECKING:
+    from solver import Dados
+
+def carregar_dados(pasta="data", padrao=None) -> list[tuple[str, Dados]]:
+    """Carrega as instâncias JSON da pasta (apenas as que casam com a expressão regular 'padrao', caso informada)."""
+    from solver.instancia import carregar_instancia
+
+    arquivos_json = [f for f in sorted(os.listdir(pasta)) if f.endswith(".json") and (padrao is None or re.search(padrao, f))]
     
     dados_lista = []
     for arquivo in arquivos_json:
         caminho_completo = os.path.join(pasta, arquivo)
         try:
-            with open(caminho_completo, "r", encoding="utf-8") as f:
-                dados_json = json.load(f)
-                dados_lista.append((arquivo, Dados(**dados_json)))
-        except (json.JSONDecodeError, OSError, TypeError) as e:
+            dados_lista.append((arquivo, carregar_instancia(caminho_completo)))
+        except (json.JSONDecodeError, OSError, TypeError, ValueError) as e:
             print(f"Erro ao carregar {arquivo}: {e}")
     
     return dados_lista
 
-def execucao_heuristica_multiple_times(heuristica, max_exec=1000, n_execucoes=10):
-    solucoes = []
-    tempos = []
-    iteracoes = []
-    iteracoes_convergencia = []
+# Configurações de cada heurística comparadas pelo ajuste de parâmetros (None usa a calibração automática da heurística)
+ESPACO_PARAMETROS = {
+    "random_search": [{}],
+    "simulated_annealing": [{"T_inicial": T, "alpha": alpha} for T in (None, 1.0, 10.0, 1000.0) for alpha in (None, 0.99, 0.995, 0.999)],
+    "tabu_search": [{"tamanho_tabu": tamanho, "tamanho_vizinhanca": vizinhanca} for tamanho in (5, 10, 20, 40) for vizinhanca in (50, 100, 200)],
+}
+
+def executa_heuristica(arquivo: str, dados: Dados, nome_heuristica: str, max_exec: int, semente: int, execucao: int, tempo_limite: float = None, inicial: str = None, parametros: dict = None, grupos: int = None, operadores: bool = False) -> tuple[float, float, int, int]:
+    """Executa uma vez a heurística sobre a instância, com um gerador próprio derivado da semente.
+    O resultado depende apenas dos argumentos, não da ordem ou do processo em que a execução acontece
+    (exceto quando a execução é interrompida pelo 'tempo_limite', em segundos).
+    Com 'inicial', a busca parte da solução gulosa dessa estratégia (ver Modelo.gera_solucao_gulosa) em vez de uma aleatória.
+    Os 'parametros' são repassados à heurística (ver ESPACO_PARAMETROS). Com 'grupos', a instância é dividida nesse total de grupos de
+    talhões, resolvidos separadamente e combinados (ver Heuristica.decomposicao). Com 'operadores', os vizinhos são gerados por todos os
+    operadores, escolhidos por SeletorOperadores; sem ele, apenas por realocações de lotes."""
+    from solver import ControleBusca, Heuristica, Modelo, SeletorOperadores
+
+    rng = random.Random(f"{semente}:{arquivo}:{nome_heuristica}:{execucao}")
+    modelo = Modelo(dados, rng, seletor=SeletorOperadores() if operadores else None)
+    heuristica = Heuristica(modelo)
+    controle = None if tempo_limite is None else ControleBusca(tempo_limite=tempo_limite)
+
+    inicio = time.time()
+    solucao_inicial = None if inicial is None else modelo.gera_solucao_gulosa(inicial)
+    if grupos is not None:
+        solucao, iteracao, iteracao_convergencia = heuristica.decomposicao(
+            nome_heuristica, max_exec=max_exec, n_grupos=grupos, controle=controle, solucao_inicial=solucao_inicial, **(parametros or {})
+        )
+    else:
+        solucao, iteracao, iteracao_convergencia = getattr(heuristica, nome_heuristica)(
+            max_exec=max_exec, controle=controle, solucao_inicial=solucao_inicial, **(parametros or {})
+        )
+    tempo_execucao = time.time() - inicio
 
-    for _ in range(n_execucoes):
-        inicio = time.time()
-        solucao, iteracao, iteracao_convergencia = heuristica(max_exec=max_exec)
-        tempo_execucao = time.time() - inicio
+    return solucao.M, tempo_execucao, iteracao, iteracao_convergencia
 
-        solucoes.append(solucao.M)
-        tempos.append(tempo_execucao)
-        iteracoes.append(iteracao)
-        iteracoes_convergencia.append(iteracao_convergencia)
+def _executa_tarefa(tarefa: tuple) -> tuple[float, float, int, int]:
+    return executa_heuristica(*tarefa)
 
-    return {
+def resumir_execucoes(execucoes: list[tuple[float, float, int, int]], limite_inferior: float = None) -> dict:
+    """Estatísticas das execuções. Com o 'limite_inferior' do makespan da instância, inclui o gap de otimalidade da melhor solução
+    e o gap médio das execuções."""
+    import numpy as np
+    from solver.limites import gap
+
+    solucoes = [solucao for solucao, _, _, _ in execucoes]
+    tempos = [tempo for _, tempo, _, _ in execucoes]
+    iteracoes = [iteracao for _, _, iteracao, _ in execucoes]
+    iteracoes_convergencia = [iteracao_convergencia for _, _, _, iteracao_convergencia in execucoes]
+
+    resumo = {
         "solucoes": solucoes,
         "melhor_solucao": np.min(solucoes),
         "media_solucao": np.mean(solucoes),
@@ -51,117 +90,347 @@ def execucao_heuristica_multiple_times(heuristica, max_exec=1000, n_execucoes=10
         "media_iteracoes_convergencia": np.mean(iteracoes_convergencia),
         "desvio_padrao_iteracoes_convergencia": np.std(iteracoes_convergencia)
     }
+    if limite_inferior is not None:
+        resumo["limite_inferior"] = limite_inferior
+        resumo["gap_melhor_solucao"] = gap(resumo["melhor_solucao"], limite_inferior)
+        resumo["media_gap"] = np.mean([gap(solucao, limite_inferior) for solucao in solucoes])
+    return resumo
+
+def chave_execucao(arquivo: str, nome_heuristica: str, max_exec: int, semente: int, execucao: int, operadores: bool = False) -> tuple:
+    return (arquivo, nome_heuristica, max_exec, semente, execucao, operadores)
+
+def carregar_execucoes(nome_arquivo: str) -> dict[tuple, dict]:
+    """Lê os registros já gravados no arquivo de execuções (uma execução JSON por linha), indexados por 'chave_execucao'.
+    Uma última linha incompleta, deixada por uma interrupção durante a escrita, é ignorada."""
+    execucoes = {}
+    if not os.path.exists(nome_arquivo):
+        return execucoes
+
+    with open(nome_arquivo, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            # Registros gravados antes da opção de operadores usam apenas realocações
+            execucoes[chave_execucao(registro["arquivo"], registro["heuristica"], registro["max_exec"], registro["semente"], registro["execucao"],
+                                     registro.get("operadores", False))] = registro
+
+    return execucoes
+
+def abrir_arquivo_execucoes(nome_arquivo: str):
+    """Abre o arquivo de execuções para acrescentar registros, terminando uma eventual linha incompleta."""
+    f = open(nome_arquivo, "a+", encoding="utf-8")
+    if f.tell() > 0:
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")
+    return f
+
+def registrar_execucao(f, tarefa: tuple, execucao: tuple[float, float, int, int]) -> None:
+    """Grava a execução como uma linha do arquivo e força a escrita em disco, de forma que ela sobreviva a uma interrupção."""
+    arquivo, _, nome_heuristica, max_exec, semente, n_execucao, _, _, _, _, operadores = tarefa
+    solucao, tempo, iteracao, iteracao_convergencia = execucao
+    registro = {
+        "arquivo": arquivo,
+        "heuristica": nome_heuristica,
+        "max_exec": max_exec,
+        "semente": semente,
+        "execucao": n_execucao,
+        "operadores": operadores,
+        "solucao": solucao,
+        "tempo": tempo,
+        "iteracoes": iteracao,
+        "iteracoes_convergencia": iteracao_convergencia,
+    }
+    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+def executa_instancias(instancias: list[tuple[str, Dados]], n_execucoes=10, max_exec=2000, semente=0, n_processos=None, arquivo_execucoes="execucoes.jsonl", operadores=False) -> dict[str, dict]:
+    """Executa cada heurística 'n_execucoes' vezes em cada instância. As execuções são independentes e distribuídas
+    entre 'n_processos' processos (todos os núcleos por padrão; 1 executa em série). Para a mesma semente,
+    as soluções são as mesmas em qualquer número de processos. Com 'operadores', os vizinhos são gerados por todos os
+    operadores (ver executa_heuristica).
+
+    Cada execução é gravada em 'arquivo_execucoes' assim que termina, e as execuções já gravadas (mesma instância,
+    heurística, max_exec, semente, repetição e operadores) não são refeitas. O resumo é calculado a partir desse arquivo."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from solver import HEURISTICAS
+    from solver.limites import limite_inferior
+
+    tarefas = [
+        (arquivo, dados, nome_heuristica, max_exec, semente, execucao, None, None, None, None, operadores)
+        for arquivo, dados in instancias
+        for nome_heuristica in HEURISTICAS
+        for execucao in range(n_execucoes)
+    ]
+    concluidas = carregar_execucoes(arquivo_execucoes)
+    pendentes = [
+        tarefa for tarefa in tarefas
+        if chave_execucao(tarefa[0], tarefa[2], max_exec, semente, tarefa[5], operadores) not in concluidas
+    ]
+
+    print(f"Executando {len(instancias)} arquivos {n_execucoes} vezes ({len(pendentes)} de {len(tarefas)} execuções pendentes)")
+    with abrir_arquivo_execucoes(arquivo_execucoes) as f:
+        if n_processos == 1:
+            for tarefa in pendentes:
+                registrar_execucao(f, tarefa, _executa_tarefa(tarefa))
+        else:
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                futuros = {executor.submit(_executa_tarefa, tarefa): tarefa for tarefa in pendentes}
+                for futuro in as_completed(futuros):
+                    registrar_execucao(f, futuros[futuro], futuro.result())
 
-def executa_instancias(instancias: list[tuple[str, Dados]], n_execucoes=10) -> dict[str, dict]:
+    limites = {arquivo: limite_inferior(dados) for arquivo, dados in instancias}
+    return resumir_arquivo_execucoes(arquivo_execucoes, [arquivo for arquivo, _ in instancias], n_execucoes, max_exec, semente, limites, operadores)
+
+def resumir_arquivo_execucoes(arquivo_execucoes: str, arquivos: list[str], n_execucoes: int, max_exec: int, semente: int, limites: dict[str, float] = None, operadores: bool = False) -> dict[str, dict]:
+    """Calcula as estatísticas de cada instância e heurística a partir das execuções gravadas ('limites' são os limites inferiores
+    do makespan de cada instância, para o cálculo do gap)."""
+    from solver import HEURISTICAS
+
+    limites = limites or {}
+    execucoes = carregar_execucoes(arquivo_execucoes)
     solucoes = {}
-    for arquivo, dados in instancias:
-        modelo = Modelo(dados)
-        heuristica = Heuristica(modelo)
-        max_exec = 2000
-        
-        print(f"Executando arquivo {arquivo} {n_execucoes} vezes")
-        solucoes_random = execucao_heuristica_multiple_times(heuristica.random_search, max_exec=max_exec, n_execucoes=n_execucoes)
-        solucoes_annealing = execucao_heuristica_multiple_times(heuristica.simulated_annealing, max_exec=max_exec, n_execucoes=n_execucoes)
-        solucoes_tabu = execucao_heuristica_multiple_times(heuristica.tabu_search, max_exec=max_exec, n_execucoes=n_execucoes)
-
-        solucoes[arquivo] = {
-            "random_search": solucoes_random,
-            "simulated_annealing": solucoes_annealing,
-            "tabu_search": solucoes_tabu
-        }
+    for arquivo in arquivos:
+        for nome_heuristica in HEURISTICAS:
+            registros = [execucoes.get(chave_execucao(arquivo, nome_heuristica, max_exec, semente, execucao, operadores)) for execucao in range(n_execucoes)]
+            registros = [registro for registro in registros if registro is not None]
+            if registros:
+                solucoes.setdefault(arquivo, {})[nome_heuristica] = resumir_execucoes([
+                    (registro["solucao"], registro["tempo"], registro["iteracoes"], registro["iteracoes_convergencia"]) for registro in registros
+                ], limites.get(arquivo))
 
     return solucoes
 
+def ajustar_parametros(instancias: list[tuple[str, Dados]], n_sementes=3, max_exec=2000, eta=3, semente=0, n_processos=None, operadores=False) -> dict[int, dict]:
+    """Escolhe a melhor configuração (heurística e parâmetros de ESPACO_PARAMETROS) de cada família de instâncias, com o mesmo total de lotes,
+    por halving sucessivo: em cada rodada, as configurações restantes são executadas 'n_sementes' vezes em cada instância da família
+    e apenas a fração 1 / 'eta' com o menor gap médio em relação ao limite inferior segue para a próxima rodada, com 'eta' vezes mais
+    iterações. A última rodada usa 'max_exec' iterações, e as anteriores, frações dele, de forma que as configurações ruins são
+    descartadas por execuções curtas. As execuções de cada rodada são distribuídas entre 'n_processos' processos. Com 'operadores',
+    os vizinhos de todas as configurações são gerados por todos os operadores (ver executa_heuristica)."""
+    import math
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+    from solver import HEURISTICAS
+    from solver.limites import gap, limite_inferior
+
+    familias = {}
+    for arquivo, dados in instancias:
+        familias.setdefault(dados.nL, []).append((arquivo, dados))
+    configuracoes = [(nome_heuristica, parametros) for nome_heuristica in HEURISTICAS for parametros in ESPACO_PARAMETROS[nome_heuristica]]
+    n_rodadas = max(1, math.ceil(math.log(len(configuracoes), eta)))
+
+    ajuste = {}
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        for familia, membros in sorted(familias.items()):
+            limites = {arquivo: limite_inferior(dados) for arquivo, dados in membros}
+            restantes = list(range(len(configuracoes)))
+            orcamento_usado = 0
+            for rodada in range(n_rodadas):
+                orcamento = max(1, round(max_exec / eta ** (n_rodadas - 1 - rodada)))
+                tarefas = [
+                    (c, (arquivo, dados, configuracoes[c][0], orcamento, semente, execucao, None, None, configuracoes[c][1], None, operadores))
+                    for c in restantes
+                    for arquivo, dados in membros
+                    for execucao in range(n_sementes)
+                ]
+                gaps = {c: [] for c in restantes}
+                tempos = {c: [] for c in restantes}
+                for (c, tarefa), (solucao, tempo, _, _) in zip(tarefas, executor.map(_executa_tarefa, [tarefa for _, tarefa in tarefas])):
+                    gaps[c].append(gap(solucao, limites[tarefa[0]]))
+                    tempos[c].append(tempo)
+                orcamento_usado += orcamento * len(tarefas)
+
+                # Empates no gap (comuns nas instâncias pequenas) favorecem a configuração mais rápida
+                classificacao = sorted(restantes, key=lambda c: (np.mean(gaps[c]), np.mean(tempos[c])))
+                finalistas = classificacao
+                restantes = classificacao[:max(1, math.ceil(len(restantes) / eta))]
+
+            melhor = restantes[0]
+            ajuste[familia] = {
+                "instancias": [arquivo for arquivo, _ in membros],
+                "heuristica": configuracoes[melhor][0],
+                "parametros": configuracoes[melhor][1],
+                "operadores": operadores,
+                "max_exec": max_exec,
+                "media_gap": np.mean(gaps[melhor]),
+                "media_tempo": np.mean(tempos[melhor]),
+                "finalistas": [
+                    {"heuristica": configuracoes[c][0], "parametros": configuracoes[c][1], "media_gap": np.mean(gaps[c]), "media_tempo": np.mean(tempos[c])}
+                    for c in finalistas
+                ],
+                # Fração das iterações de uma varredura completa (todas as configurações com 'max_exec' iterações)
+                "fracao_orcamento": orcamento_usado / (len(configuracoes) * len(membros) * n_sementes * max_exec),
+            }
+            print(f"{familia} lotes: {ajuste[familia]['heuristica']} {ajuste[familia]['parametros']} "
+                  f"(gap médio {ajuste[familia]['media_gap']:.2%}, {ajuste[familia]['fracao_orcamento']:.0%} do orçamento da varredura completa)")
+
+    return ajuste
+
 def salvar_resultados(solucoes: dict[str, dict], nome_arquivo="resultados.json"):
     with open(nome_arquivo, "w", encoding="utf-8") as f:
         json.dump(solucoes, f, ensure_ascii=False, indent=4)
 
-def salvar_resultados_sheets(solucoes: dict[str, dict], nome_planilha="resultados_100_exec"):
-    credenciais_arquivo = 'googleconfig.json'
-    SCOPES = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive.file'
-    ]
+def exportar_resultados_csv(solucoes: dict[str, dict], nome_arquivo="resultados.csv"):
+    """Exporta o resumo (com a lista de soluções individuais) em CSV, pronto para ser importado em uma planilha."""
+    import csv
 
-    try:
-        creds = Credentials.from_service_account_file(credenciais_arquivo, scopes=SCOPES)
-        gc = gspread.authorize(creds)
-    except Exception as e:
-        print(f"Erro ao autenticar com a Google Sheets API: {e}")
-        return
+    colunas = {
+        "Melhor Solução": "melhor_solucao",
+        "Média Solução": "media_solucao",
+        "Desvio Padrão Solução": "desvio_padrao_solucao",
+        "Média Tempo de Execução": "media_tempos_execucao",
+        "Desvio Padrão Tempo Execução": "desvio_padrao_tempos_execucao",
+        "Média Iterações": "media_iteracoes",
+        "Desvio Padrão Iterações": "desvio_padrao_iteracoes",
+        "Média Iterações Convergência": "media_iteracoes_convergencia",
+        "Desvio Padrão Iterações Convergência": "desvio_padrao_iteracoes_convergencia",
+        "Limite Inferior": "limite_inferior",
+        "Gap Melhor Solução": "gap_melhor_solucao",
+        "Média Gap": "media_gap",
+    }
 
-    try:
-        try:
-            planilha = gc.open(nome_planilha)
-        except gspread.SpreadsheetNotFound:
-            planilha = gc.create(nome_planilha)
-            print(f"Planilha '{nome_planilha}' criada. Compartilhe com seu e-mail: {creds.service_account_email}")
-        except Exception as e:
-            print(f"Erro ao tentar abrir a planilha: {e}")
-            return
-        planilha.share("montebellerlucas@gmail.com", perm_type='user', role='writer')
-    except Exception as e:
-        print(f"Erro geral ao lidar com a planilha: {e}")
-        return
-
-    todas_linhas_resumo = []
-    for arquivo, resultados_heuristica in solucoes.items():
-        for nome_heuristica, resultados in resultados_heuristica.items():
-            solucoes_individuais_list = resultados.get('solucoes', [])
-            solucoes_individuais_str = ", ".join(map(str, solucoes_individuais_list))
-
-            linha_resumo = {
-                "Experimento": arquivo,
-                "Heurística": nome_heuristica,
-                "Soluções": solucoes_individuais_str,
-                "Melhor Solução": resultados.get('melhor_solucao', ''),
-                "Média Solução": resultados.get('media_solucao', ''),
-                "Desvio Padrão Solução": resultados.get('desvio_padrao_solucao', ''),
-                "Média Tempo de Execução": resultados.get('media_tempos_execucao', ''),
-                "Desvio Padrão Tempo Execução": resultados.get('desvio_padrao_tempos_execucao', ''),
-                "Média Iterações": resultados.get('media_iteracoes', ''),
-                "Desvio Padrão Iterações": resultados.get('desvio_padrao_iteracoes', ''),
-                "Média Iterações Convergência": resultados.get('media_iteracoes_convergencia', ''),
-                "Desvio Padrão Iterações Convergência": resultados.get('desvio_padrao_iteracoes_convergencia', '')
-            }
+    with open(nome_arquivo, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["Experimento", "Heurística", "Soluções", *colunas])
+        for arquivo, resultados_heuristica in solucoes.items():
+            for nome_heuristica, resultados in resultados_heuristica.items():
+                solucoes_individuais_str = ", ".join(map(str, resultados.get('solucoes', [])))
+                escritor.writerow([arquivo, nome_heuristica, solucoes_individuais_str, *(resultados.get(chave, '') for chave in colunas.values())])
 
-            todas_linhas_resumo.append(linha_resumo)
+    print(f"Resultados resumidos (com lista individual) exportados para '{nome_arquivo}'.")
 
-    df_final_resumo = pd.DataFrame(todas_linhas_resumo)
-    df_final_resumo = df_final_resumo.replace({np.nan: '', None: ''})
 
-    nome_aba = "Resultados"
-    try:
-        aba = planilha.worksheet(nome_aba)
-        aba.clear()
-    except gspread.WorksheetNotFound:
-        aba = planilha.add_worksheet(title=nome_aba, rows=df_final_resumo.shape[0]+1, cols=df_final_resumo.shape[1])
+def imprimir_resultados(solucoes: dict[str, dict]):
+    for arquivo, resultado in solucoes.items():
+        print(f"###### {arquivo} ######")
+        for heuristica, resultado_heuristica in resultado.items():
+            print(f"  {heuristica}:")
+            print(f"    Média da solução: {resultado_heuristica['media_solucao']}")
+            print(f"    Desvio padrão da solução: {resultado_heuristica['desvio_padrao_solucao']}")
+            print(f"    Média das iterações: {resultado_heuristica['media_iteracoes']}")
+            print(f"    Desvio padrão das iterações: {resultado_heuristica['desvio_padrao_iteracoes']}")
+            print(f"    Média do tempo de execução: {resultado_heuristica['media_tempos_execucao']:.4f} segundos")
+            print(f"    Desvio padrão do tempo de execução: {resultado_heuristica['desvio_padrao_tempos_execucao']:.4f} segundos")
+            print(f"    Média de iterações até convergência: {resultado_heuristica['media_iteracoes_convergencia']}")
+            print(f"    Desvio padrão de iterações até convergência: {resultado_heuristica['desvio_padrao_iteracoes_convergencia']}")
+            if "limite_inferior" in resultado_heuristica:
+                print(f"    Limite inferior: {resultado_heuristica['limite_inferior']} (gap da melhor solução: {resultado_heuristica['gap_melhor_solucao']:.2%})")
+            print("\n")
 
-    valores = [df_final_resumo.columns.tolist()] + df_final_resumo.values.tolist()
-    aba.update(valores)
+def comando_resolver(args):
+    from solver.instancia import carregar_instancia
+    from solver.limites import gap, limite_inferior
 
-    print(f"Resultados resumidos (com lista individual) salvos na aba '{nome_aba}' da planilha '{nome_planilha}'.")
+    dados = carregar_instancia(args.instancia)
+    limite = limite_inferior(dados)
+    # Com ilhas, o simulated annealing roda em cadeias paralelas (ver Heuristica.simulated_annealing_ilhas)
+    nome_heuristica, parametros = args.heuristica, None
+    if args.ilhas is not None:
+        nome_heuristica, parametros = "simulated_annealing_ilhas", {"n_ilhas": args.ilhas}
+    solucao, tempo, iteracao, iteracao_convergencia = executa_heuristica(
+        os.path.basename(args.instancia), dados, nome_heuristica, args.max_exec, args.semente, 0, args.tempo_limite, args.inicial, parametros,
+        grupos=args.grupos, operadores=args.operadores
+    )
+    if args.json:
+        print(json.dumps({
+            "solucao": solucao, "tempo": tempo, "iteracoes": iteracao, "iteracoes_convergencia": iteracao_convergencia,
+            "limite_inferior": limite, "gap": gap(solucao, limite),
+        }))
+    else:
+        print(f"Makespan: {solucao}")
+        print(f"Tempo de execução: {tempo:.4f} segundos")
+        print(f"Iterações: {iteracao} (convergência em {iteracao_convergencia})")
+        print(f"Limite inferior: {limite} (gap: {gap(solucao, limite):.2%})")
 
+def comando_experimento(args):
+    dados = carregar_dados(args.pasta, args.instancias)
+    solucoes = executa_instancias(dados, args.n_execucoes, args.max_exec, args.semente, args.processos, args.execucoes, args.operadores)
+    salvar_resultados(solucoes, args.resultados)
+    if args.csv is not None:
+        exportar_resultados_csv(solucoes, args.csv)
+    print('')
+    imprimir_resultados(solucoes)
+
+def comando_ajustar(args):
+    dados = carregar_dados(args.pasta, args.instancias)
+    ajuste = ajustar_parametros(dados, args.n_sementes, args.max_exec, args.eta, args.semente, args.processos, args.operadores)
+    salvar_resultados(ajuste, args.saida)
+
+def comando_exportar(args):
+    with open(args.resultados, "r", encoding="utf-8") as f:
+        solucoes = json.load(f)
+    exportar_resultados_csv(solucoes, args.saida)
+
+def comando_servir(args):
+    import sys
+    from servico import servir
+
+    servir(sys.stdin, sys.stdout, args.processos)
 
 def main():
-    dados = carregar_dados()
-    solucoes = executa_instancias(dados, n_execucoes=1)
-    # salvar_resultados_sheets(solucoes)
-    print('')
+    from solver import HEURISTICAS
+
+    parser = argparse.ArgumentParser(description="Programação de veículos e empilhadeiras por heurísticas.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    resolver = subparsers.add_parser("resolver", help="Executa uma heurística uma vez sobre uma instância.")
+    resolver.add_argument("instancia", help="Arquivo JSON da instância.")
+    resolver.add_argument("--heuristica", choices=HEURISTICAS, default="simulated_annealing")
+    resolver.add_argument("--max-exec", type=int, default=2000, help="Total máximo de iterações.")
+    resolver.add_argument("--semente", type=int, default=0)
+    resolver.add_argument("--tempo-limite", type=float, default=None, help="Segundos máximos de execução.")
+    resolver.add_argument("--inicial", choices=("menor_termino", "talhao", "regret"), default=None, help="Estratégia gulosa da solução inicial (aleatória por padrão).")
+    resolver.add_argument("--grupos", type=int, default=None, help="Divide a instância em grupos de talhões resolvidos em paralelo pela heurística escolhida e combinados (instâncias grandes; a tabu_search rende mais nos grupos).")
+    resolver.add_argument("--operadores", action="store_true", help="Gera os vizinhos com todos os operadores, escolhidos de forma adaptativa (apenas realocações por padrão).")
+    resolver.add_argument("--ilhas", type=int, default=None, help="Executa o simulated annealing em N cadeias paralelas que trocam a melhor solução (modelo de ilhas).")
+    resolver.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+    resolver.set_defaults(funcao=comando_resolver)
+
+    experimento = subparsers.add_parser("experimento", help="Executa todas as heurísticas várias vezes sobre as instâncias de uma pasta.")
+    experimento.add_argument("--pasta", default="data")
+    experimento.add_argument("--instancias", default=None, help="Expressão regular para filtrar as instâncias.")
+    experimento.add_argument("--n-execucoes", type=int, default=10)
+    experimento.add_argument("--max-exec", type=int, default=2000, help="Total máximo de iterações de cada execução.")
+    experimento.add_argument("--semente", type=int, default=0)
+    experimento.add_argument("--processos", type=int, default=None, help="Total de processos (todos os núcleos por padrão).")
+    experimento.add_argument("--operadores", action="store_true", help="Gera os vizinhos com todos os operadores (apenas realocações por padrão).")
+    experimento.add_argument("--execucoes", default="execucoes.jsonl", help="Arquivo em que cada execução é gravada ao terminar, usado para retomar o experimento.")
+    experimento.add_argument("--resultados", default="resultados.json", help="Arquivo em que o resumo é gravado.")
+    experimento.add_argument("--csv", default=None, help="Exporta também o resumo em CSV para este arquivo.")
+    experimento.set_defaults(funcao=comando_experimento)
+
+    ajustar = subparsers.add_parser("ajustar", help="Escolhe a melhor heurística e parâmetros de cada família de instâncias por halving sucessivo.")
+    ajustar.add_argument("--pasta", default="data")
+    ajustar.add_argument("--instancias", default=None, help="Expressão regular para filtrar as instâncias.")
+    ajustar.add_argument("--n-sementes", type=int, default=3, help="Execuções de cada configuração em cada instância, por rodada.")
+    ajustar.add_argument("--max-exec", type=int, default=2000, help="Total máximo de iterações de cada execução da última rodada.")
+    ajustar.add_argument("--eta", type=int, default=3, help="Fator de redução das configurações (e de aumento das iterações) a cada rodada.")
+    ajustar.add_argument("--semente", type=int, default=0)
+    ajustar.add_argument("--processos", type=int, default=None, help="Total de processos (todos os núcleos por padrão).")
+    ajustar.add_argument("--operadores", action="store_true", help="Gera os vizinhos com todos os operadores (apenas realocações por padrão).")
+    ajustar.add_argument("--saida", default="ajuste.json", help="Arquivo em que a configuração escolhida para cada família é gravada.")
+    ajustar.set_defaults(funcao=comando_ajustar)
+
+    exportar = subparsers.add_parser("exportar", help="Exporta em CSV o resumo gravado por um experimento.")
+    exportar.add_argument("--resultados", default="resultados.json")
+    exportar.add_argument("--saida", default="resultados.csv")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    servico = subparsers.add_parser("servir", help="Atende pedidos de otimização em JSON, um por linha, mantendo as instâncias carregadas (ver servico.py).")
+    servico.add_argument("--processos", type=int, default=None, help="Total de processos de trabalho (todos os núcleos por padrão).")
+    servico.set_defaults(funcao=comando_servir)
 
-    # for arquivo, resultado in solucoes.items():
-    #     print(f"###### {arquivo} ######")
-    #     for heuristica, resultado_heuristica in resultado.items():
-    #         print(f"  {heuristica}:")
-    #         print(f"    Média da solução: {resultado_heuristica['media_solucao']}")
-    #         print(f"    Desvio padrão da solução: {resultado_heuristica['desvio_padrao_solucao']}")
-    #         print(f"    Média das iterações: {resultado_heuristica['media_iteracoes']}")
-    #         print(f"    Desvio padrão das iterações: {resultado_heuristica['desvio_padrao_iteracoes']}")
-    #         print(f"    Média do tempo de execução: {resultado_heuristica['media_tempos_execucao']:.4f} segundos")
-    #         print(f"    Desvio padrão do tempo de execução: {resultado_heuristica['desvio_padrao_tempos_execucao']:.4f} segundos")
-    #         print(f"    Média de iterações até convergência: {resultado_heuristica['media_iteracoes_convergencia']}")
-    #         print(f"    Desvio padrão de iterações até convergência: {resultado_heuristica['desvio_padrao_iteracoes_convergencia']}")
-    #         print("\n")
+    args = parser.parse_args()
+    if args.comando == "resolver" and args.ilhas is not None:
+        if args.heuristica != "simulated_annealing" or args.grupos is not None:
+            parser.error("--ilhas exige --heuristica simulated_annealing e não pode ser combinado com --grupos.")
+        if args.ilhas < 1:
+            parser.error("--ilhas deve ser pelo menos 1.")
+    args.funcao(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,106 @@
+"""Serviço local de otimização: recebe pedidos em JSON, um por linha, e responde com eventos em JSON, um por linha.
+
+Pedido de otimização (apenas 'instancia' é obrigatório):
+    {"id": "p1", "instancia": "data/exp08_01.json", "heuristica": "simulated_annealing", "max_exec": 2000,
+     "tempo_limite": 5.0, "semente": 0, "inicial": "regret", "operadores": false}
+
+Eventos de cada pedido, na ordem:
+    {"id": "p1", "evento": "incumbente", "makespan": ..., "iteracao": ..., "tempo": ...}   (a cada nova melhor solução)
+    {"id": "p1", "evento": "resultado", "makespan": ..., "tempo": ..., "iteracoes": ..., "iteracoes_convergencia": ...,
+     "limite_inferior": ..., "gap": ..., "sequencia_veiculo": [...], "sequencia_empilhadeira": [...]}
+ou {"id": "p1", "evento": "erro", "mensagem": ...}.
+
+Os pedidos são distribuídos entre processos de trabalho que mantêm em memória as instâncias já carregadas (e o modelo
+montado sobre elas), de forma que o custo de iniciar o interpretador e de carregar cada instância é pago uma vez.
+Para a mesma instância, heurística, semente, max_exec, inicial e operadores, o resultado é o mesmo de 'main.py resolver'.
+"""
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TextIO
+from solver import HEURISTICAS, ControleBusca, Heuristica, Modelo, SeletorOperadores
+from solver.instancia import carregar_instancia
+from solver.limites import gap
+
+# Estado de cada processo de trabalho: fila de eventos compartilhada e modelos das instâncias já carregadas
+_eventos = None
+_modelos: dict[str, tuple[float, Modelo]] = {}
+
+def _iniciar_trabalhador(eventos: multiprocessing.Queue) -> None:
+    global _eventos
+    _eventos = eventos
+
+def _carregar_modelo(caminho: str) -> Modelo:
+    """Modelo da instância, recarregada apenas quando o arquivo é alterado."""
+    modificacao = os.path.getmtime(caminho)
+    if caminho not in _modelos or _modelos[caminho][0] != modificacao:
+        _modelos[caminho] = (modificacao, Modelo(carregar_instancia(caminho)))
+    return _modelos[caminho][1]
+
+def _resolver(pedido: dict) -> None:
+    """Executa um pedido em um processo de trabalho, enviando os eventos pela fila."""
+    identificador = pedido.get("id")
+    try:
+        caminho = pedido["instancia"]
+        nome_heuristica = pedido.get("heuristica", "simulated_annealing")
+        if nome_heuristica not in HEURISTICAS:
+            raise ValueError(f"Heurística desconhecida: {nome_heuristica}")
+
+        # Mesmo gerador de 'main.executa_heuristica' (execução 0). Com 'operadores', um seletor de operadores novo a cada pedido
+        modelo = _carregar_modelo(caminho)
+        modelo.rng = random.Random(f"{pedido.get('semente', 0)}:{os.path.basename(caminho)}:{nome_heuristica}:0")
+        modelo.seletor = SeletorOperadores() if pedido.get("operadores", False) else None
+
+        inicio = time.time()
+        controle = ControleBusca(
+            tempo_limite=pedido.get("tempo_limite"),
+            ao_melhorar=lambda solucao, iteracao: _eventos.put({
+                "id": identificador, "evento": "incumbente", "makespan": solucao.M, "iteracao": iteracao, "tempo": time.time() - inicio,
+            }),
+        )
+        solucao_inicial = None if pedido.get("inicial") is None else modelo.gera_solucao_gulosa(pedido["inicial"])
+        solucao, iteracoes, iteracoes_convergencia = getattr(Heuristica(modelo), nome_heuristica)(
+            max_exec=pedido.get("max_exec", 2000), controle=controle, solucao_inicial=solucao_inicial
+        )
+        _eventos.put({
+            "id": identificador, "evento": "resultado", "makespan": solucao.M, "tempo": time.time() - inicio,
+            "iteracoes": iteracoes, "iteracoes_convergencia": iteracoes_convergencia,
+            "limite_inferior": modelo.limite_inferior, "gap": gap(solucao.M, modelo.limite_inferior),
+            "sequencia_veiculo": solucao.sequencia_veiculo, "sequencia_empilhadeira": solucao.sequencia_empilhadeira,
+        })
+    except Exception as erro:
+        _eventos.put({"id": identificador, "evento": "erro", "mensagem": f"{type(erro).__name__}: {erro}"})
+
+def _escrever_eventos(eventos: multiprocessing.Queue, saida: TextIO) -> None:
+    """Escreve os eventos na saída, um por linha, até receber None."""
+    while (evento := eventos.get()) is not None:
+        saida.write(json.dumps(evento, ensure_ascii=False) + "\n")
+        saida.flush()
+
+def servir(entrada: TextIO, saida: TextIO, n_processos: int = None) -> None:
+    """Atende os pedidos lidos de 'entrada' até o fim do arquivo, com 'n_processos' processos de trabalho (todos os núcleos por
+    padrão), e escreve os eventos em 'saida'. Os pedidos em andamento são concluídos antes de encerrar."""
+    eventos = multiprocessing.Queue()
+    escritor = threading.Thread(target=_escrever_eventos, args=(eventos, saida), daemon=True)
+    escritor.start()
+
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador, initargs=(eventos,)) as executor:
+        eventos.put({"evento": "pronto", "heuristicas": list(HEURISTICAS)})
+        for linha in entrada:
+            if not linha.strip():
+                continue
+            try:
+                pedido = json.loads(linha)
+                if not isinstance(pedido, dict) or "instancia" not in pedido:
+                    raise ValueError("O pedido deve ser um objeto JSON com o campo 'instancia'.")
+            except ValueError as erro:
+                eventos.put({"id": None, "evento": "erro", "mensagem": str(erro)})
+                continue
+            executor.submit(_resolver, pedido)
+
+    eventos.put(None)
+    escritor.join()
@@ -1,5 +1,10 @@
 from .dados import Dados
 from .modelo import Modelo
-from .heuristica import Heuristica
+from .heuristica import Heuristica, HEURISTICAS
+from .controle import ControleBusca
+from .instrumentacao import Instrumentacao
+from .operadores import SeletorOperadores
+from .resfriamento import Resfriamento
+from .limites import limite_inferior, limites_inferiores, gap
 
-__all__ = ["Dados", "Modelo", "Heuristica"]
\ No newline at end of file
+__all__ = ["Dados", "Modelo", "Heuristica", "HEURISTICAS", "ControleBusca", "Instrumentacao", "SeletorOperadores", "Resfriamento", "limite_inferior", "limites_inferiores", "gap"]
\ No newline at end of file
@@ -0,0 +1,76 @@
+import math
+import time
+from typing import Callable
+from solver.solucao import Solucao
+
+class ControleBusca:
+    """Critérios de parada e notificação de novas melhores soluções, comuns a todas as heurísticas."""
+    def __init__(self, tempo_limite: float = None, max_iteracoes_sem_melhora: int = None, ao_melhorar: Callable[[Solucao, int], None] = None, pai: "ControleBusca" = None):
+        """Atributos:
+        ----------
+        - tempo_limite: Tempo máximo de execução, em segundos (sem limite caso None).
+        - max_iteracoes_sem_melhora: Total de iterações sem melhorar a melhor solução após o qual a busca é encerrada (sem limite caso None).
+        - ao_melhorar: Função chamada com (melhor_solucao, iteracoes) a cada nova melhor solução, incluindo a inicial.
+        - prazo: Instante (time.perf_counter) em que o tempo limite se esgota, definido ao iniciar a busca.
+        - cancelado: Indica que a busca deve ser encerrada na próxima iteração.
+        - limite_inferior: Limite inferior do makespan informado ao iniciar a busca (None caso desconhecido).
+        - limite_atingido: Indica que a melhor solução alcançou o limite inferior, ou seja, é ótima.
+        - pai: Controle da busca da qual esta é uma etapa (ver 'etapa'), cujos cancelamento, prazo e limite inferior também encerram esta.
+        - iteracoes_anteriores: Iterações do pai antes desta etapa, somadas às iterações repassadas a ele.
+        - makespan_repassado: Makespan da última solução repassada ao pai (apenas soluções melhores são repassadas).
+        """
+        self.tempo_limite = tempo_limite
+        self.max_iteracoes_sem_melhora = max_iteracoes_sem_melhora
+        self.ao_melhorar = ao_melhorar
+        self.prazo = None
+        self.cancelado = False
+        self.limite_inferior = None
+        self.limite_atingido = False
+        self.pai = pai
+        self.iteracoes_anteriores = 0
+        self.makespan_repassado = math.inf
+
+    def etapa(self, iteracoes_anteriores: int = 0, makespan_repassado: float = math.inf) -> "ControleBusca":
+        """Controle de uma etapa desta busca (por exemplo, o polimento da decomposição), que pode ser iniciado pela heurística da etapa sem
+        reiniciar o prazo deste: a etapa é encerrada pelo cancelamento, pelo prazo ou pelo limite inferior deste controle, e repassa a ele
+        as soluções melhores que 'makespan_repassado' (o da melhor solução já notificada a ele)."""
+        etapa = ControleBusca(max_iteracoes_sem_melhora=self.max_iteracoes_sem_melhora, pai=self)
+        etapa.iteracoes_anteriores = iteracoes_anteriores
+        etapa.makespan_repassado = makespan_repassado
+        return etapa
+
+    def iniciar(self, limite_inferior: float = None) -> None:
+        """Marca o início da busca, a partir do qual o tempo limite é contado. Com o 'limite_inferior' do makespan, a busca é
+        encerrada assim que uma solução o alcança."""
+        self.prazo = None if self.tempo_limite is None else time.perf_counter() + self.tempo_limite
+        self.cancelado = False
+        self.limite_inferior = limite_inferior
+        self.limite_atingido = False
+
+    def cancelar(self) -> None:
+        """Solicita o encerramento da busca (por exemplo, a partir de outra thread)."""
+        self.cancelado = True
+
+    def interrompido(self) -> bool:
+        """Verifica se a busca deve ser encerrada por cancelamento, solução ótima ou tempo (próprios ou do pai)."""
+        if self.cancelado or self.limite_atingido:
+            return True
+        if self.prazo is not None and time.perf_counter() >= self.prazo:
+            return True
+        return self.pai is not None and self.pai.interrompido()
+
+    def encerrar(self, iteracoes: int, iteracoes_convergencia: int) -> bool:
+        """Verifica se a busca deve ser encerrada por cancelamento, solução ótima, tempo ou estagnação."""
+        if self.interrompido():
+            return True
+        return self.max_iteracoes_sem_melhora is not None and iteracoes - iteracoes_convergencia >= self.max_iteracoes_sem_melhora
+
+    def melhorou(self, solucao: Solucao, iteracoes: int) -> None:
+        """Notifica uma nova melhor solução."""
+        if self.limite_inferior is not None and solucao.M <= self.limite_inferior + 1e-9:
+            self.limite_atingido = True
+        if self.ao_melhorar is not None:
+            self.ao_melhorar(solucao, iteracoes)
+        if self.pai is not None and solucao.M < self.makespan_repassado:
+            self.makespan_repassado = solucao.M
+            self.pai.melhorou(solucao, self.iteracoes_anteriores + iteracoes)
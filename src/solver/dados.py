@@ -1,10 +1,11 @@
 class Dados:
     """Classe que armazena os dados do problema."""
-    def __init__(self, nV, nE, TC, T_ida, LE, DE):
+    def __init__(self, nV, nE, TC, T_ida, LE=None, DE=None, talhao_lote=None, nT=None):
         """Atributos:
         ----------
         - nL: Total de lotes disponíveis.
-        - nT: Total de talhões disponíveis.
+        - nT: Total de talhões disponíveis. No formato compacto, pode ser informado para incluir talhões sem lotes após o último com lotes
+          (por padrão, o maior talhão de 'talhao_lote').
         - nV: Total de veículos disponíveis.
         - nE: Total de empilhadeiras disponíveis.
         - TC: Tempo fixo de carregamento em horas.
@@ -13,24 +14,57 @@ class Dados:
         - L: Conjunto dos lotes.
         - T: Conjunto dos talhões.
         - LT: Lista com o total de lotes em cada talhão.
-        - LE: Matriz binária (a, i) que identifica se o lote 'i' pertence ao talhão 'a'.
+        - LE: Matriz binária (a, i) que identifica se o lote 'i' pertence ao talhão 'a'. No formato compacto, é montada apenas quando acessada.
+        - talhao_lote: Lista com o talhão de cada lote (indexada pelo lote - 1). No formato compacto, substitui a matriz LE.
+        - lotes_talhao: Lista com os lotes de cada talhão (indexada pelo talhão, incluindo os virtuais).
         - T_ida: Lista com o tempo de ida da fábrica até cada lote.
         - T_volta: Lista com o tempo de volta do lote à fábrica (calculado como 1.15 vezes o tempo de ida).
         - DE: Matriz (a, b) que representa o tempo de deslocamento entre os talhões 'a' e 'b'.
         """
+        if (LE is None) == (talhao_lote is None):
+            raise ValueError("Informe exatamente um entre 'LE' e 'talhao_lote'.")
+
         self.nV = nV
         self.nE = nE
         self.TC = TC
         self.T_ida = T_ida
-        self.LE = LE # total de linhas = total de talhões 'a' + 2 virtuais | total de colunas = total de lotes 'i'
+        self._LE = LE # total de linhas = total de talhões 'a' + 2 virtuais | total de colunas = total de lotes 'i'
         self.DE = DE
 
         self.T_volta = [1.15 * t for t in self.T_ida]
-        self.nT = len(self.LE) - 2 # removendo os virtuais
-        self.nL = len(self.LE[1])
-        self.LT = [sum(row) for row in self.LE[1:-1]] # desconsidera o primeiro e ultimo, que são virtuais
+
+        # Índices pré-calculados para evitar varreduras da matriz LE a cada consulta
+        if LE is not None:
+            self.nT = len(self.LE) - 2 # removendo os virtuais
+            if nT is not None and nT != self.nT:
+                raise ValueError("O total de talhões 'nT' não corresponde à matriz 'LE'.")
+            self.nL = len(self.LE[1])
+            self.talhao_lote = [0 for _ in range(self.nL)]
+            for a in range(1, self.nT + 1):
+                for i in range(self.nL):
+                    if self.LE[a][i] == 1:
+                        self.talhao_lote[i] = a
+        else:
+            self.nT = max(talhao_lote) if nT is None else nT
+            if self.nT < max(talhao_lote):
+                raise ValueError("O total de talhões 'nT' é menor que o maior talhão de 'talhao_lote'.")
+            self.nL = len(talhao_lote)
+            self.talhao_lote = list(talhao_lote)
+
+        self.lotes_talhao = [[] for _ in range(self.nT + 2)]
+        for i, a in enumerate(self.talhao_lote, start=1):
+            self.lotes_talhao[a].append(i)
+        self.LT = [len(lotes) for lotes in self.lotes_talhao[1:-1]] # desconsidera o primeiro e ultimo, que são virtuais
 
         self.V = [v for v in range(1, self.nV + 1)]
         self.E = [e for e in range(1, self.nE + 1)]
         self.L = [l for l in range(1, self.nL + 1)]
-        self.T = [a for a in range(1, self.nT + 1)]
\ No newline at end of file
+        self.T = [a for a in range(1, self.nT + 1)]
+
+    @property
+    def LE(self) -> list:
+        if self._LE is None:
+            self._LE = [[0 for _ in range(self.nL)] for _ in range(self.nT + 2)]
+            for i, a in enumerate(self.talhao_lote):
+                self._LE[a][i] = 1
+        return self._LE
@@ -0,0 +1,346 @@
+import math
+import numpy as np
+from solver.dados import Dados
+
+class Decodificador:
+    """Decodifica uma solução codificada em arrays (sequência de lotes de cada veículo e empilhadeira de cada talhão) no respectivo cronograma."""
+    def __init__(self, dados: Dados):
+        """Atributos:
+        ----------
+        - T_ida, T_volta: Arrays com os tempos de ida e volta de cada lote (indexados pelo lote - 1).
+        - DE: Array (a, b) com o tempo de deslocamento entre os talhões 'a' e 'b'.
+        - talhao_lote: Array com o talhão de cada lote (indexado pelo lote - 1).
+        - LT: Array com o total de lotes de cada talhão (indexado pelo talhão, incluindo os virtuais).
+
+        As listas privadas são cópias das tabelas e áreas de trabalho reaproveitadas entre as chamadas de 'avaliar'.
+        """
+        self.dados = dados
+        self.T_ida = np.asarray(dados.T_ida, dtype=np.float64)
+        self.T_volta = np.asarray(dados.T_volta, dtype=np.float64)
+        self.DE = np.asarray(dados.DE, dtype=np.float64)
+        self.talhao_lote = np.asarray(dados.talhao_lote, dtype=np.intp)
+        self.LT = np.asarray([len(lotes) for lotes in dados.lotes_talhao], dtype=np.intp)
+
+        # O laço do decodificador é escalar: listas Python evitam o custo de acessar elementos de arrays NumPy um a um
+        self._T_ida = self.T_ida.tolist()
+        self._T_volta = self.T_volta.tolist()
+        self._DE = self.DE.tolist()
+        self._talhao_lote = self.talhao_lote.tolist()
+        self._LT = self.LT.tolist()
+
+        self._zeros_veiculo = [0 for _ in range(dados.nV + 1)]
+        self._zeros_talhao = [0 for _ in range(dados.nT + 2)]
+        self._zeros_empilhadeira = [0 for _ in range(dados.nE + 1)]
+        self._posicao_veiculo = list(self._zeros_veiculo)
+        self._ultimo_lote_veiculo = list(self._zeros_veiculo)
+        self._inicio_ultimo_lote_veiculo = list(self._zeros_veiculo)
+        self._lotes_atendidos_talhao = list(self._zeros_talhao)
+        self._inicio_ultimo_lote_talhao = list(self._zeros_talhao)
+        self._talhao_iniciado = list(self._zeros_talhao)
+        self._talhao_empilhadeira = list(self._zeros_empilhadeira)
+        self._aguardando = list(self._zeros_veiculo)
+
+    def codificar(self, sequencia_veiculo: list) -> tuple[np.ndarray, np.ndarray]:
+        """Converte as sequências dos veículos para o formato (lotes, inicio_veiculo): os lotes de todos os veículos concatenados
+        e a posição em 'lotes' onde começa a sequência de cada veículo (com uma posição extra ao final)."""
+        lotes = np.fromiter((i for sequencia in sequencia_veiculo for i in sequencia), dtype=np.intp, count=self.dados.nL)
+        inicio_veiculo = np.zeros(self.dados.nV + 1, dtype=np.intp)
+        np.cumsum([len(sequencia) for sequencia in sequencia_veiculo], out=inicio_veiculo[1:])
+        return lotes, inicio_veiculo
+
+    def avaliar(self, lotes: np.ndarray, inicio_veiculo: np.ndarray, empilhadeira_talhao: np.ndarray, prioridade: np.ndarray = None,
+                B: np.ndarray = None, W: np.ndarray = None, H: np.ndarray = None, C: np.ndarray = None) -> float:
+        """Retorna o makespan da solução codificada (math.inf caso o impasse entre as empilhadeiras não possa ser desfeito).
+
+        - lotes, inicio_veiculo: Sequências dos veículos no formato de 'codificar'.
+        - empilhadeira_talhao[a]: Empilhadeira que atende o talhão 'a'.
+        - prioridade[i - 1]: Ordem em que os veículos são programados, pelo próximo lote de cada um. Caso não seja informada,
+          é programado primeiro o veículo que chega antes no próximo lote. Usar os tempos H de uma solução reproduz o cronograma dela.
+        - B, W, H (por lote - 1) e C (por talhão): Arrays opcionais preenchidos com os tempos do cronograma.
+
+        As regras são as da reprogramação do Modelo: o veículo cujo próximo talhão depende de uma empilhadeira ocupada aguarda até que
+        algum talhão seja finalizado e, caso todos os veículos restantes aguardem, o impasse é desfeito por '_desfazer_impasse'.
+        """
+        nV = self.dados.nV
+        TC = self.dados.TC
+        T_ida = self._T_ida
+        T_volta = self._T_volta
+        DE = self._DE
+        talhao_lote = self._talhao_lote
+        LT = self._LT
+        lotes = lotes.tolist()
+        inicio_veiculo = inicio_veiculo.tolist()
+        empilhadeira_talhao = empilhadeira_talhao.tolist()
+        if prioridade is not None:
+            prioridade = prioridade.tolist()
+
+        posicao_veiculo = self._posicao_veiculo
+        ultimo_lote_veiculo = self._ultimo_lote_veiculo
+        inicio_ultimo_lote_veiculo = self._inicio_ultimo_lote_veiculo
+        lotes_atendidos_talhao = self._lotes_atendidos_talhao
+        inicio_ultimo_lote_talhao = self._inicio_ultimo_lote_talhao
+        talhao_iniciado = self._talhao_iniciado
+        talhao_empilhadeira = self._talhao_empilhadeira
+        aguardando = self._aguardando
+
+        posicao_veiculo[1:] = inicio_veiculo[:-1]
+        ultimo_lote_veiculo[:] = self._zeros_veiculo
+        inicio_ultimo_lote_veiculo[:] = self._zeros_veiculo
+        lotes_atendidos_talhao[:] = self._zeros_talhao
+        inicio_ultimo_lote_talhao[:] = self._zeros_talhao
+        talhao_iniciado[:] = self._zeros_talhao
+        talhao_empilhadeira[:] = self._zeros_empilhadeira
+        aguardando[:] = self._zeros_veiculo
+
+        makespan = 0.0
+        atendidos = 0
+        while atendidos < len(lotes):
+            # Seleciona, entre os veículos que não aguardam, o de menor prioridade (ou chegada) no próximo lote
+            k = 0
+            menor_chave = math.inf
+            for v in range(1, nV + 1):
+                posicao = posicao_veiculo[v]
+                if posicao == inicio_veiculo[v] or aguardando[v]:
+                    continue
+                lote = lotes[posicao]
+                if prioridade is not None:
+                    chave = prioridade[lote - 1]
+                elif ultimo_lote_veiculo[v] == 0:
+                    chave = T_ida[lote - 1]
+                else:
+                    chave = inicio_ultimo_lote_veiculo[v] + TC + T_volta[ultimo_lote_veiculo[v] - 1] + T_ida[lote - 1]
+                if chave < menor_chave:
+                    k = v
+                    menor_chave = chave
+
+            if k == 0:
+                # Todos os veículos restantes aguardam empilhadeiras ocupadas
+                if not self._desfazer_impasse(lotes, inicio_veiculo, empilhadeira_talhao, prioridade):
+                    return math.inf
+                aguardando[:] = self._zeros_veiculo
+                continue
+
+            proximo_lote = lotes[posicao_veiculo[k]]
+            ultimo_lote = ultimo_lote_veiculo[k]
+            if ultimo_lote == 0: # garagem
+                chegada = T_ida[proximo_lote - 1]
+            else:
+                chegada = inicio_ultimo_lote_veiculo[k] + TC + T_volta[ultimo_lote - 1] + T_ida[proximo_lote - 1]
+
+            b = talhao_lote[proximo_lote - 1]
+            if talhao_iniciado[b]:
+                inicio_empilhadeira = inicio_ultimo_lote_talhao[b] + TC
+            else:
+                e = empilhadeira_talhao[b]
+                a = talhao_empilhadeira[e]
+                if a == 0: # primeiro atendimento da empilhadeira
+                    inicio_empilhadeira = chegada
+                elif lotes_atendidos_talhao[a] == LT[a]:
+                    inicio_empilhadeira = inicio_ultimo_lote_talhao[a] + TC + DE[a][b]
+                else:
+                    # A empilhadeira ainda não finalizou o talhão atual: o veículo aguarda
+                    aguardando[k] = True
+                    continue
+                talhao_iniciado[b] = True
+                talhao_empilhadeira[e] = b
+                if C is not None:
+                    C[b] = inicio_empilhadeira
+
+            espera = max(0.0, inicio_empilhadeira - chegada)
+            inicio = chegada + espera
+            if B is not None:
+                B[proximo_lote - 1] = chegada
+            if W is not None:
+                W[proximo_lote - 1] = espera
+            if H is not None:
+                H[proximo_lote - 1] = inicio
+
+            ultimo_lote_veiculo[k] = proximo_lote
+            inicio_ultimo_lote_veiculo[k] = inicio
+            lotes_atendidos_talhao[b] += 1
+            if inicio > inicio_ultimo_lote_talhao[b]:
+                inicio_ultimo_lote_talhao[b] = inicio
+            if inicio > makespan:
+                makespan = inicio
+            posicao_veiculo[k] += 1
+            atendidos += 1
+
+            # A empilhadeira do talhão finalizado fica livre para os veículos que aguardavam
+            if lotes_atendidos_talhao[b] == LT[b]:
+                aguardando[:] = self._zeros_veiculo
+
+        return makespan
+
+    def _desfazer_impasse(self, lotes: list, inicio_veiculo: list, empilhadeira_talhao: list, prioridade: list) -> bool:
+        """Desfaz o impasse em que todos os veículos restantes aguardam empilhadeiras ocupadas, como Modelo.__desfazer_impasse: havendo
+        empilhadeira livre, ela passa a atender o talhão do primeiro veículo (pela prioridade ou chegada); caso contrário, o primeiro veículo
+        que ainda tem lotes de um talhão em atendimento passa a atender um deles em seguida. Altera 'lotes' e 'empilhadeira_talhao' e
+        retorna False caso nenhum dos dois seja possível."""
+        TC = self.dados.TC
+        posicao_veiculo = self._posicao_veiculo
+        ultimo_lote_veiculo = self._ultimo_lote_veiculo
+        inicio_ultimo_lote_talhao = self._inicio_ultimo_lote_talhao
+        talhao_empilhadeira = self._talhao_empilhadeira
+
+        def chave(v: int) -> tuple[float, int]:
+            lote = lotes[posicao_veiculo[v]]
+            if prioridade is not None:
+                return prioridade[lote - 1], v
+            if ultimo_lote_veiculo[v] == 0:
+                return self._T_ida[lote - 1], v
+            return self._inicio_ultimo_lote_veiculo[v] + TC + self._T_volta[ultimo_lote_veiculo[v] - 1] + self._T_ida[lote - 1], v
+
+        veiculos = sorted((v for v in range(1, self.dados.nV + 1) if posicao_veiculo[v] < inicio_veiculo[v]), key=chave)
+        livres = [e for e in range(1, self.dados.nE + 1) if self._lotes_atendidos_talhao[talhao_empilhadeira[e]] == self._LT[talhao_empilhadeira[e]]]
+        if livres:
+            talhao = self._talhao_lote[lotes[posicao_veiculo[veiculos[0]]] - 1]
+            # Uma empilhadeira que ainda não atendeu tem preferência; entre as demais, a que chega mais cedo ao talhão
+            for e in livres:
+                if talhao_empilhadeira[e] == 0:
+                    empilhadeira_talhao[talhao] = e
+                    return True
+            empilhadeira_talhao[talhao] = min(livres, key=lambda e: inicio_ultimo_lote_talhao[talhao_empilhadeira[e]] + self._DE[talhao_empilhadeira[e]][talhao])
+            return True
+
+        for v in veiculos:
+            for posicao in range(posicao_veiculo[v] + 1, inicio_veiculo[v]):
+                if self._talhao_iniciado[self._talhao_lote[lotes[posicao] - 1]]:
+                    lotes.insert(posicao_veiculo[v], lotes.pop(posicao))
+                    return True
+        return False
+
+    def avaliar_lote(self, lotes: np.ndarray, inicio_veiculo: np.ndarray, empilhadeira_talhao: np.ndarray, prioridade: np.ndarray = None) -> np.ndarray:
+        """Versão vetorizada de 'avaliar' para várias soluções de uma vez: cada linha de 'lotes' (n, nL) e 'inicio_veiculo' (n, nV + 1)
+        é uma solução, e todas compartilham a 'prioridade'. A 'empilhadeira_talhao' pode ser comum a todas (nT + 2,) ou própria de cada
+        solução (n, nT + 2). Retorna o array (n,) com os makespans, iguais aos de 'avaliar' para cada solução.
+
+        As soluções são decodificadas em paralelo com operações sobre arrays no lugar do laço escalar: a cada passo, cada solução atende
+        um lote ou desfaz o impasse em que todos os veículos restantes aguardam. Um veículo que aguarda em 'avaliar' só volta a ser
+        considerado quando algum talhão é finalizado, e até lá sua empilhadeira continua ocupada; por isso, aqui os veículos que
+        aguardam são identificados a cada passo pelo estado das empilhadeiras, sem um passo para cada espera."""
+        n, nL = lotes.shape
+        nV = self.dados.nV
+        TC = self.dados.TC
+        veiculos = np.arange(1, nV + 1)
+        j = np.arange(nL)[None, :]
+
+        # Os impasses alteram as sequências e as empilhadeiras de cada solução
+        lotes = lotes.copy()
+        empilhadeira_talhao = np.array(np.broadcast_to(empilhadeira_talhao, (n, self.dados.nT + 2)))
+
+        posicao_veiculo = np.zeros((n, nV + 1), dtype=np.intp)
+        posicao_veiculo[:, 1:] = inicio_veiculo[:, :-1]
+        fim_veiculo = inicio_veiculo[:, 1:]
+        ultimo_lote_veiculo = np.zeros((n, nV + 1), dtype=np.intp)
+        inicio_ultimo_lote_veiculo = np.zeros((n, nV + 1), dtype=np.float64)
+        lotes_atendidos_talhao = np.zeros((n, self.dados.nT + 2), dtype=np.intp)
+        inicio_ultimo_lote_talhao = np.zeros((n, self.dados.nT + 2), dtype=np.float64)
+        talhao_iniciado = np.zeros((n, self.dados.nT + 2), dtype=np.bool_)
+        talhao_empilhadeira = np.zeros((n, self.dados.nE + 1), dtype=np.intp)
+        atendidos = np.zeros(n, dtype=np.intp)
+        makespan = np.zeros(n, dtype=np.float64)
+
+        while True:
+            linhas = np.flatnonzero(atendidos < nL)
+            if len(linhas) == 0:
+                break
+            coluna = linhas[:, None]
+
+            # Próximo lote, talhão e prioridade (ou chegada) de cada veículo
+            posicao = posicao_veiculo[linhas, 1:]
+            restantes = posicao < fim_veiculo[linhas]
+            lote = lotes[coluna, np.minimum(posicao, nL - 1)]
+            talhao = self.talhao_lote[lote - 1]
+            if prioridade is not None:
+                chave = prioridade[lote - 1]
+            else:
+                ultimo = ultimo_lote_veiculo[linhas, 1:]
+                chave = np.where(ultimo == 0, self.T_ida[lote - 1], inicio_ultimo_lote_veiculo[linhas, 1:] + TC + self.T_volta[ultimo - 1] + self.T_ida[lote - 1])
+
+            # Aguardam os veículos cujo talhão, ainda não iniciado, depende de uma empilhadeira que não finalizou o talhão atual
+            # (o talhão virtual 0 tem LT = 0, então uma empilhadeira que ainda não atendeu está sempre livre)
+            iniciado = talhao_iniciado[coluna, talhao]
+            ocupacao = talhao_empilhadeira[coluna, empilhadeira_talhao[coluna, talhao]]
+            disponiveis = restantes & (iniciado | (lotes_atendidos_talhao[coluna, ocupacao] == self.LT[ocupacao]))
+
+            # Seleciona, em cada solução, o veículo disponível de menor prioridade (ou chegada)
+            indice = np.argmin(np.where(disponiveis, chave, math.inf), axis=1)
+            passo = np.arange(len(linhas))
+            travadas = ~disponiveis[passo, indice]
+            if travadas.any():
+                self._desfazer_impasses(linhas[travadas], np.where(restantes[travadas], chave[travadas], math.inf), lotes, fim_veiculo, empilhadeira_talhao,
+                                        posicao_veiculo, talhao_empilhadeira, lotes_atendidos_talhao, inicio_ultimo_lote_talhao, talhao_iniciado, atendidos, makespan)
+                linhas, indice, passo = linhas[~travadas], indice[~travadas], passo[~travadas]
+
+            k = veiculos[indice]
+            proximo_lote = lote[passo, indice]
+            b = talhao[passo, indice]
+            iniciado = iniciado[passo, indice]
+            e = empilhadeira_talhao[linhas, b]
+            a = talhao_empilhadeira[linhas, e]
+
+            ultimo_lote = ultimo_lote_veiculo[linhas, k]
+            chegada = np.where(ultimo_lote == 0, self.T_ida[proximo_lote - 1], inicio_ultimo_lote_veiculo[linhas, k] + TC + self.T_volta[ultimo_lote - 1] + self.T_ida[proximo_lote - 1])
+            inicio_empilhadeira = np.where(
+                iniciado,
+                inicio_ultimo_lote_talhao[linhas, b] + TC,
+                np.where(a == 0, chegada, inicio_ultimo_lote_talhao[linhas, a] + TC + self.DE[a, b]),
+            )
+            talhao_iniciado[linhas, b] = True
+            talhao_empilhadeira[linhas, e] = np.where(iniciado, a, b)
+
+            inicio = chegada + np.maximum(0.0, inicio_empilhadeira - chegada)
+            ultimo_lote_veiculo[linhas, k] = proximo_lote
+            inicio_ultimo_lote_veiculo[linhas, k] = inicio
+            lotes_atendidos_talhao[linhas, b] += 1
+            inicio_ultimo_lote_talhao[linhas, b] = np.maximum(inicio_ultimo_lote_talhao[linhas, b], inicio)
+            makespan[linhas] = np.maximum(makespan[linhas], inicio)
+            posicao_veiculo[linhas, k] += 1
+            atendidos[linhas] += 1
+
+        return makespan
+
+    def _desfazer_impasses(self, linhas: np.ndarray, chave: np.ndarray, lotes: np.ndarray, fim_veiculo: np.ndarray, empilhadeira_talhao: np.ndarray,
+                           posicao_veiculo: np.ndarray, talhao_empilhadeira: np.ndarray, lotes_atendidos_talhao: np.ndarray,
+                           inicio_ultimo_lote_talhao: np.ndarray, talhao_iniciado: np.ndarray, atendidos: np.ndarray, makespan: np.ndarray) -> None:
+        """Versão vetorizada de '_desfazer_impasse' para as soluções 'linhas' de 'avaliar_lote', com a 'chave' (prioridade ou chegada) do
+        próximo lote de cada veículo (math.inf nos que já terminaram). Altera 'lotes' e 'empilhadeira_talhao' das soluções; as que não
+        admitem nenhum dos reparos são encerradas com makespan math.inf."""
+        nL = lotes.shape[1]
+        veiculos = np.arange(1, self.dados.nV + 1)
+        j = np.arange(nL)[None, :]
+
+        # Havendo empilhadeira livre, ela passa a atender o talhão do primeiro veículo: uma que ainda não atendeu ou a que chega
+        # mais cedo ao talhão
+        ocupacao = talhao_empilhadeira[linhas]
+        livres = lotes_atendidos_talhao[linhas[:, None], ocupacao] == self.LT[ocupacao]
+        livres[:, 0] = False
+        com_livre = livres.any(axis=1)
+        r = linhas[com_livre]
+        if len(r) > 0:
+            primeiro = veiculos[np.argmin(chave[com_livre], axis=1)]
+            talhao = self.talhao_lote[lotes[r, posicao_veiculo[r, primeiro]] - 1]
+            ocupacao = ocupacao[com_livre]
+            chegada = np.where(ocupacao == 0, -math.inf, inicio_ultimo_lote_talhao[r[:, None], ocupacao] + self.DE[ocupacao, talhao[:, None]])
+            empilhadeira_talhao[r, talhao] = np.argmin(np.where(livres[com_livre], chegada, math.inf), axis=1)
+
+        # Caso contrário, o primeiro veículo (pela chave) que ainda tem lotes de um talhão em atendimento passa a atender o primeiro deles
+        r = linhas[~com_livre]
+        if len(r) > 0:
+            em_atendimento = talhao_iniciado[r[:, None], self.talhao_lote[lotes[r] - 1]]
+            candidata = np.full((len(r), self.dados.nV + 1), nL)
+            for v in veiculos:
+                mascara = em_atendimento & (j > posicao_veiculo[r, v][:, None]) & (j < fim_veiculo[r, v - 1][:, None])
+                candidata[:, v] = np.where(mascara.any(axis=1), mascara.argmax(axis=1), nL)
+            ordem = veiculos[np.argsort(chave[~com_livre], axis=1, kind="stable")]
+            possiveis = candidata[np.arange(len(r))[:, None], ordem] < nL
+
+            inviaveis = ~possiveis.any(axis=1)
+            makespan[r[inviaveis]] = math.inf
+            atendidos[r[inviaveis]] = nL
+
+            v = ordem[np.arange(len(r)), possiveis.argmax(axis=1)][~inviaveis]
+            r = r[~inviaveis]
+            p = posicao_veiculo[r, v][:, None]
+            q = candidata[~inviaveis][np.arange(len(r)), v][:, None]
+            lotes[r] = lotes[r[:, None], np.where(j == p, q, j - ((j > p) & (j <= q)))]
@@ -0,0 +1,120 @@
+import math
+import numpy as np
+from solver.dados import Dados
+from solver.solucao import Solucao
+
+class Subproblema:
+    """Parte da instância formada por um grupo de talhões, atendida apenas pelos veículos e pelas empilhadeiras reservados a ele."""
+    def __init__(self, dados: Dados, talhoes: list[int], veiculos: list[int], empilhadeiras: list[int]):
+        """Atributos:
+        ----------
+        - talhoes, veiculos, empilhadeiras: Talhões, veículos e empilhadeiras da instância original, na ordem em que são renumerados.
+        - lotes: Lotes da instância original pertencentes aos talhões, na ordem em que são renumerados.
+        - dados: Instância do subproblema, com lotes, talhões, veículos e empilhadeiras numerados a partir de 1.
+        """
+        self.talhoes = talhoes
+        self.veiculos = veiculos
+        self.empilhadeiras = empilhadeiras
+        self.lotes = [i for a in talhoes for i in dados.lotes_talhao[a]]
+
+        # Os talhões virtuais (0 e nT + 1) mantêm os deslocamentos da instância original, quando existirem
+        originais = [0, *talhoes, dados.nT + 1]
+        DE = [[dados.DE[a][b] if a < len(dados.DE) and b < len(dados.DE[a]) else 0.0 for b in originais] for a in originais]
+        novo_talhao = {a: indice for indice, a in enumerate(talhoes, start=1)}
+        self.dados = Dados(
+            len(veiculos), len(empilhadeiras), dados.TC, [dados.T_ida[i - 1] for i in self.lotes],
+            DE=DE, talhao_lote=[novo_talhao[dados.talhao_lote[i - 1]] for i in self.lotes],
+        )
+
+def agrupar_talhoes(dados: Dados, n_grupos: int, folga: float = 1.25, max_iteracoes: int = 20) -> list[list[int]]:
+    """Agrupa os talhões em até 'n_grupos' grupos de talhões próximos entre si pelas distâncias DE (k-medoides). Cada grupo tem no máximo
+    'folga' vezes a média de lotes por grupo, de forma que os subproblemas tenham tamanhos parecidos."""
+    talhoes = [a for a in dados.T if dados.lotes_talhao[a]]
+    n_grupos = max(1, min(n_grupos, len(talhoes)))
+    DE = np.asarray(dados.DE, dtype=np.float64)[np.ix_(talhoes, talhoes)]
+    lotes = np.array([dados.LT[a - 1] for a in talhoes])
+    capacidade = max(int(lotes.max()), math.ceil(folga * lotes.sum() / n_grupos))
+
+    # Medoides iniciais afastados: o talhão mais distante dos demais e, a seguir, o mais distante dos já escolhidos
+    medoides = [int(np.argmax(DE.sum(axis=1)))]
+    while len(medoides) < n_grupos:
+        distancia = DE[:, medoides].min(axis=1)
+        distancia[medoides] = -1.0
+        medoides.append(int(np.argmax(distancia)))
+
+    for _ in range(max_iteracoes):
+        grupo = _atribuir_talhoes(DE, lotes, medoides, capacidade)
+        novos_medoides = []
+        for g in range(n_grupos):
+            membros = np.flatnonzero(grupo == g)
+            novos_medoides.append(int(membros[np.argmin(DE[np.ix_(membros, membros)].sum(axis=1))]))
+        if novos_medoides == medoides:
+            break
+        medoides = novos_medoides
+
+    return [[talhoes[j] for j in np.flatnonzero(grupo == g)] for g in range(n_grupos)]
+
+def _atribuir_talhoes(DE: np.ndarray, lotes: np.ndarray, medoides: list[int], capacidade: int) -> np.ndarray:
+    """Atribui cada talhão ao medoide mais próximo com capacidade. Os talhões com maior diferença entre o segundo medoide mais próximo e o
+    mais próximo são atribuídos primeiro, e os que não cabem em nenhum grupo vão para o grupo com mais capacidade restante."""
+    grupo = np.full(len(lotes), -1)
+    restante = np.full(len(medoides), capacidade)
+    for g, j in enumerate(medoides):
+        grupo[j] = g
+        restante[g] -= lotes[j]
+
+    distancias = DE[:, medoides]
+    ordenadas = np.sort(distancias, axis=1)
+    arrependimento = ordenadas[:, 1] - ordenadas[:, 0] if len(medoides) > 1 else np.zeros(len(lotes))
+    for j in np.argsort(-arrependimento, kind="stable"):
+        if grupo[j] >= 0:
+            continue
+        candidatos = [g for g in np.argsort(distancias[j], kind="stable") if restante[g] >= lotes[j]]
+        g = candidatos[0] if candidatos else int(np.argmax(restante))
+        grupo[j] = g
+        restante[g] -= lotes[j]
+    return grupo
+
+def repartir(total: int, pesos: list[float], minimo: int = 1) -> list[int]:
+    """Divide 'total' unidades entre os pesos, com ao menos 'minimo' para cada e as demais proporcionais aos pesos (maiores restos)."""
+    cotas = [(total - minimo * len(pesos)) * peso / sum(pesos) for peso in pesos]
+    partes = [minimo + int(cota) for cota in cotas]
+    maiores_restos = sorted(range(len(pesos)), key=lambda g: cotas[g] - int(cotas[g]), reverse=True)
+    for g in maiores_restos[:total - sum(partes)]:
+        partes[g] += 1
+    return partes
+
+def dividir_instancia(dados: Dados, grupos: list[list[int]]) -> list[Subproblema]:
+    """Monta um subproblema para cada grupo de talhões. Os veículos são repartidos pelo tempo total de viagem dos lotes de cada grupo, e as
+    empilhadeiras, pelo total de lotes. Cada grupo recebe ao menos dois veículos, exigidos pelas vizinhanças (ver Modelo.gera_movimento_vizinho),
+    e uma empilhadeira."""
+    if len(grupos) > min(dados.nV // 2, dados.nE):
+        raise ValueError("Cada grupo de talhões precisa de pelo menos dois veículos e uma empilhadeira.")
+
+    viagens = [sum(dados.T_ida[i - 1] + dados.TC + dados.T_volta[i - 1] for a in grupo for i in dados.lotes_talhao[a]) for grupo in grupos]
+    lotes = [sum(dados.LT[a - 1] for a in grupo) for grupo in grupos]
+    n_veiculos = repartir(dados.nV, viagens, minimo=2)
+    n_empilhadeiras = repartir(dados.nE, lotes)
+
+    subproblemas = []
+    primeiro_veiculo = primeira_empilhadeira = 1
+    for grupo, nV, nE in zip(grupos, n_veiculos, n_empilhadeiras):
+        veiculos = list(range(primeiro_veiculo, primeiro_veiculo + nV))
+        empilhadeiras = list(range(primeira_empilhadeira, primeira_empilhadeira + nE))
+        subproblemas.append(Subproblema(dados, grupo, veiculos, empilhadeiras))
+        primeiro_veiculo += nV
+        primeira_empilhadeira += nE
+    return subproblemas
+
+def combinar_solucoes(dados: Dados, subproblemas: list[Subproblema], solucoes: list[Solucao]) -> Solucao:
+    """Traduz as sequências e os tempos H das soluções dos subproblemas para a instância original. Apenas as sequências e H são preenchidos:
+    o cronograma completo é reconstruído por Modelo.reprogramar."""
+    solucao = Solucao(dados)
+    for subproblema, parte in zip(subproblemas, solucoes):
+        for k, sequencia in zip(subproblema.veiculos, parte.sequencia_veiculo):
+            solucao.sequencia_veiculo[k - 1] = [subproblema.lotes[i - 1] for i in sequencia]
+        for e, sequencia in zip(subproblema.empilhadeiras, parte.sequencia_empilhadeira):
+            solucao.sequencia_empilhadeira[e - 1] = [subproblema.talhoes[a - 1] for a in sequencia]
+        for i, H in zip(subproblema.lotes, parte.H):
+            solucao.H[i - 1] = H
+    return solucao
@@ -0,0 +1,95 @@
+from solver.dados import Dados
+from solver.solucao import Solucao
+
+class EstadoConstrucao:
+    """Mantém contadores e ponteiros da construção de uma solução, evitando varrer as matrizes da solução a cada decisão."""
+    __slots__ = (
+        "dados",
+        "lotes_nao_atendidos",
+        "posicao_lote",
+        "ultimo_lote_veiculo",
+        "inicio_ultimo_lote_veiculo",
+        "lotes_atendidos_talhao",
+        "inicio_ultimo_lote_talhao",
+        "empilhadeira_talhao",
+        "talhao_empilhadeira",
+    )
+
+    def __init__(self, dados: Dados, lotes_nao_atendidos: list = None):
+        """Atributos:
+        ----------
+        - lotes_nao_atendidos: Lista dos lotes ainda não atendidos (sem ordem definida). Por padrão, todos os lotes.
+        - posicao_lote[i]: Posição do lote 'i' em 'lotes_nao_atendidos' (-1 caso já tenha sido atendido).
+        - ultimo_lote_veiculo[k]: Último lote atendido pelo veículo 'k' (0 representa a garagem).
+        - inicio_ultimo_lote_veiculo[k]: Tempo de início do atendimento do último lote do veículo 'k'.
+        - lotes_atendidos_talhao[a]: Total de lotes já atendidos do talhão 'a'.
+        - inicio_ultimo_lote_talhao[a]: Tempo de início do atendimento do último lote do talhão 'a'.
+        - empilhadeira_talhao[a]: Empilhadeira que atende o talhão 'a' (0 caso o atendimento não tenha começado).
+        - talhao_empilhadeira[e]: Último talhão atendido pela empilhadeira 'e' (0 caso ainda não tenha atendido).
+        """
+        self.dados = dados
+        self.lotes_nao_atendidos = list(dados.L if lotes_nao_atendidos is None else lotes_nao_atendidos)
+        self.posicao_lote = [-1 for _ in range(dados.nL + 1)] # índice 0 não utilizado
+        for posicao, i in enumerate(self.lotes_nao_atendidos):
+            self.posicao_lote[i] = posicao
+        self.ultimo_lote_veiculo = [0 for _ in range(dados.nV + 1)]
+        self.inicio_ultimo_lote_veiculo = [0.0 for _ in range(dados.nV + 1)]
+        self.lotes_atendidos_talhao = [0 for _ in range(dados.nT + 2)]
+        self.inicio_ultimo_lote_talhao = [0.0 for _ in range(dados.nT + 2)]
+        self.empilhadeira_talhao = [0 for _ in range(dados.nT + 2)]
+        self.talhao_empilhadeira = [0 for _ in range(dados.nE + 1)]
+
+    @classmethod
+    def a_partir_da_solucao(cls, solucao: Solucao, corte: float) -> "EstadoConstrucao":
+        """Reconstrói o estado da construção de 'solucao' logo após o atendimento de todos os lotes com início anterior a 'corte'."""
+        dados = solucao.dados
+        estado = cls(dados, [i for i in dados.L if solucao.H[i - 1] >= corte])
+        for k, sequencia in enumerate(solucao.sequencia_veiculo, start=1):
+            # Os lotes de cada veículo já estão ordenados pelo tempo de atendimento
+            for i in sequencia:
+                if solucao.H[i - 1] >= corte:
+                    break
+                estado.__contabilizar_atendimento(k, i, solucao.H[i - 1])
+
+        for e, sequencia in enumerate(solucao.sequencia_empilhadeira, start=1):
+            for a in sequencia:
+                if estado.lotes_atendidos_talhao[a] == 0:
+                    break
+                estado.registrar_empilhadeira(e, a)
+
+        return estado
+
+    def talhao_finalizado(self, a: int) -> bool:
+        """Verifica se todos os lotes do talhão 'a' já foram atendidos."""
+        return self.lotes_atendidos_talhao[a] == self.dados.LT[a - 1]
+
+    def empilhadeira_livre(self, e: int) -> bool:
+        """Verifica se a empilhadeira 'e' ainda não atendeu nenhum talhão ou já finalizou o último."""
+        a = self.talhao_empilhadeira[e]
+        return a == 0 or self.talhao_finalizado(a)
+
+    def registrar_empilhadeira(self, e: int, a: int) -> None:
+        """Registra o deslocamento da empilhadeira 'e' para o talhão 'a'."""
+        self.empilhadeira_talhao[a] = e
+        self.talhao_empilhadeira[e] = a
+
+    def registrar_atendimento(self, k: int, i: int, inicio: float) -> None:
+        """Registra o atendimento do lote 'i' pelo veículo 'k', iniciado no tempo 'inicio'."""
+        self.__contabilizar_atendimento(k, i, inicio)
+
+        # Remoção em O(1): o último lote da lista ocupa a posição do lote atendido
+        posicao = self.posicao_lote[i]
+        ultimo = self.lotes_nao_atendidos.pop()
+        if ultimo != i:
+            self.lotes_nao_atendidos[posicao] = ultimo
+            self.posicao_lote[ultimo] = posicao
+        self.posicao_lote[i] = -1
+
+    def __contabilizar_atendimento(self, k: int, i: int, inicio: float) -> None:
+        """Atualiza os contadores do veículo 'k' e do talhão do lote 'i', sem alterar a lista de lotes não atendidos."""
+        a = self.dados.talhao_lote[i - 1]
+        self.ultimo_lote_veiculo[k] = i
+        self.inicio_ultimo_lote_veiculo[k] = inicio
+        self.lotes_atendidos_talhao[a] += 1
+        if inicio > self.inicio_ultimo_lote_talhao[a]:
+            self.inicio_ultimo_lote_talhao[a] = inicio
@@ -1,89 +1,360 @@
+import copy
 import math
+import multiprocessing
+import queue
 import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Iterator
+import numpy as np
+from solver.controle import ControleBusca
+from solver.dados import Dados
+from solver.decomposicao import agrupar_talhoes, combinar_solucoes, dividir_instancia
 from solver.modelo import Modelo
+from solver.operadores import SeletorOperadores
+from solver.resfriamento import Resfriamento
 from solver.solucao import Solucao
 
+# Heurísticas (métodos de Heuristica) comparadas nos experimentos e oferecidas pela linha de comando, pelo serviço e pelo benchmark
+HEURISTICAS = ("random_search", "simulated_annealing", "tabu_search")
+
 class Heuristica():
     """Classe criada para representar as heuristicas utilizadas para resolver o problema."""
     def __init__(self, modelo: Modelo):
         self.modelo = modelo
 
-    def random_search(self, max_exec = 100) -> tuple[Solucao, int, int]:
-        melhor_solucao = self.modelo.gera_solucao_aleatoria()
+    def random_search(self, max_exec = 100, controle: ControleBusca = None, solucao_inicial: Solucao = None) -> tuple[Solucao, int, int]:
+        """Sorteia soluções aleatórias e mantém a melhor. A 'solucao_inicial', quando informada (por exemplo, de 'Modelo.gera_solucao_gulosa'),
+        é a melhor solução de partida, como nas demais heurísticas."""
+        controle = controle if controle is not None else ControleBusca()
+        controle.iniciar(self.modelo.limite_inferior)
+        melhor_solucao = solucao_inicial if solucao_inicial is not None else self.modelo.gera_solucao_aleatoria()
         iteracoes = 0
         iteracoes_convergencia = 0
+        controle.melhorou(melhor_solucao, iteracoes)
 
-        while iteracoes < max_exec:
+        while iteracoes < max_exec and not controle.encerrar(iteracoes, iteracoes_convergencia):
             solucao = self.modelo.gera_solucao_aleatoria()
-            if solucao.M < melhor_solucao.M:
+            aceita = solucao.M < melhor_solucao.M
+            if aceita:
                 melhor_solucao = solucao
                 iteracoes_convergencia = iteracoes
+                controle.melhorou(melhor_solucao, iteracoes)
 
+            if self.modelo.instrumentacao is not None:
+                self.modelo.instrumentacao.registrar_iteracao(melhor_solucao.M, aceita)
             iteracoes += 1
 
         return melhor_solucao, iteracoes, iteracoes_convergencia
 
-    def simulated_annealing(self, T_inicial = 1000, alpha = 0.999, max_exec = 200) -> tuple[Solucao, int, int]:
-        T = T_inicial
-        solucao = self.modelo.gera_solucao_aleatoria()
+    def simulated_annealing(self, T_inicial = None, alpha = None, max_exec = 200, iteracoes_reaquecimento = None, controle: ControleBusca = None, solucao_inicial: Solucao = None) -> tuple[Solucao, int, int]:
+        """Simulated annealing. Sem 'T_inicial', a temperatura inicial é calibrada pelas pioras de vizinhos da solução inicial
+        (ver 'calibrar_temperatura'); sem 'alpha', o resfriamento acompanha a taxa de aceitação observada (ver Resfriamento).
+        Após 'iteracoes_reaquecimento' iterações sem melhora (por padrão, um décimo de 'max_exec'), a temperatura é reaquecida
+        e a busca recomeça da melhor solução."""
+        controle = controle if controle is not None else ControleBusca()
+        controle.iniciar(self.modelo.limite_inferior)
+        solucao = solucao_inicial if solucao_inicial is not None else self.modelo.gera_solucao_aleatoria()
+        controle.melhorou(solucao, 0)
+        resfriamento = self.resfriamento(solucao, T_inicial, alpha, max_exec, iteracoes_reaquecimento)
+        _, melhor_solucao, _, iteracoes, iteracoes_convergencia = self.recozer(solucao, resfriamento, max_exec, controle)
+        return melhor_solucao, iteracoes, iteracoes_convergencia
+
+    def calibrar_temperatura(self, solucao: Solucao, aceitacao: float = 0.2, n_amostras: int = 100) -> float:
+        """Temperatura em que a piora média de 'n_amostras' vizinhos sorteados de 'solucao' é aceita com probabilidade 'aceitacao'."""
+        pioras = [
+            M_vizinho - solucao.M
+            for _, M_vizinho in (self.modelo.gera_movimento_vizinho(solucao) for _ in range(n_amostras))
+            if solucao.M < M_vizinho < math.inf
+        ]
+        if not pioras:
+            # Sem pioras na amostra (platô), a escala da temperatura vem do próprio makespan
+            return 0.01 * solucao.M
+        return -(sum(pioras) / len(pioras)) / math.log(aceitacao)
+
+    def resfriamento(self, solucao: Solucao, T_inicial: float, alpha: float, max_exec: int, iteracoes_reaquecimento: int = None) -> Resfriamento:
+        """Esquema de temperatura para 'max_exec' iterações a partir de 'solucao', calibrando a temperatura inicial quando não informada."""
+        if T_inicial is None:
+            T_inicial = self.calibrar_temperatura(solucao)
+        if iteracoes_reaquecimento is None:
+            iteracoes_reaquecimento = max(100, max_exec // 10)
+        return Resfriamento(T_inicial, max_exec, alpha, iteracoes_reaquecimento=iteracoes_reaquecimento)
+
+    def recozer(self, solucao: Solucao, resfriamento: Resfriamento, max_exec: int, controle: ControleBusca = None) -> tuple[Solucao, Solucao, Resfriamento, int, int]:
+        """Executa o simulated annealing a partir de 'solucao', com a temperatura do 'resfriamento'.
+        Retorna a solução e o resfriamento finais junto da melhor solução, permitindo continuar a busca depois.
+        O 'controle' informado já deve ter sido iniciado."""
+        controle = controle if controle is not None else ControleBusca()
         melhor_solucao = solucao
         iteracoes = 0
         iteracoes_convergencia = 0
 
         # Através do fator de Boltzmann, aceita ou não a troca da solução
-        aceita_nova_solucao = lambda energia, temperatura: random.random() < math.exp(-energia / temperatura)
+        aceita_nova_solucao = lambda energia, temperatura: self.modelo.rng.random() < math.exp(-energia / temperatura)
 
-        while T > 0.01 and iteracoes < max_exec:
+        while not resfriamento.esfriou() and iteracoes < max_exec and not controle.encerrar(iteracoes, iteracoes_convergencia):
             qtde_swaps = 1 # min(max((iteracoes - iteracoes_convergencia) // 10, 1), 5)
-            nova_solucao = self.modelo.gera_solucao_vizinha(solucao, qtde_swaps=qtde_swaps)
+            # O vizinho só é materializado quando aceito
+            movimentos, M_vizinho = self.modelo.gera_movimento_vizinho(solucao, qtde_swaps=qtde_swaps)
 
-            delta_e = nova_solucao.M - solucao.M
+            delta_e = M_vizinho - solucao.M
 
             # redução de energia, implicando que a nova solução é melhor que a anterior
             if delta_e < 0:
-                solucao = nova_solucao
+                aceita = True
 
             # aumento de energia, aceita novos vizinhos com probabilidade ~ T
-            elif aceita_nova_solucao(delta_e, T):
-                solucao = nova_solucao
+            else:
+                aceita = aceita_nova_solucao(delta_e, resfriamento.T)
+
+            if aceita:
+                solucao = self.modelo.aplicar_movimentos(solucao, movimentos)
 
             # atualiza o melhor estado
-            if solucao.M < melhor_solucao.M:
+            melhorou = solucao.M < melhor_solucao.M
+            if melhorou:
                 melhor_solucao = solucao
                 iteracoes_convergencia = iteracoes
+                controle.melhorou(melhor_solucao, iteracoes)
+
+            # recompensa o operador que gerou o vizinho
+            if self.modelo.seletor is not None:
+                self.modelo.seletor.recompensar("melhor" if melhorou else "melhora" if delta_e < 0 else "aceito" if aceita else "rejeitado")
 
-            T*=alpha
+            if self.modelo.instrumentacao is not None:
+                self.modelo.instrumentacao.registrar_iteracao(solucao.M, aceita, resfriamento.T)
+
+            # reaquecimento após estagnação: a busca recomeça da melhor solução
+            if resfriamento.registrar(delta_e, aceita, melhorou):
+                solucao = melhor_solucao
             iteracoes += 1
 
+        return solucao, melhor_solucao, resfriamento, iteracoes, iteracoes_convergencia
+
+    def simulated_annealing_ilhas(self, T_inicial = None, alpha = None, max_exec = 2000, n_ilhas = 4, intervalo_migracao = 100, n_processos = None, iteracoes_reaquecimento = None, controle: ControleBusca = None, solucao_inicial: Solucao = None) -> tuple[Solucao, int, int]:
+        """Modelo de ilhas: 'n_ilhas' cadeias de simulated annealing rodam em processos separados, com sementes próprias e
+        temperaturas iniciais T_inicial, T_inicial / 2, T_inicial / 4, ... (T_inicial calibrada e resfriamento adaptativo por padrão,
+        como em 'simulated_annealing'). A cada 'intervalo_migracao' iterações as cadeias
+        enviam a melhor solução encontrada e todas recomeçam da melhor global, mantendo seus esquemas de temperatura.
+        O tempo limite do 'controle' também vale dentro de cada cadeia; a estagnação é verificada a cada migração.
+        A 'solucao_inicial', quando informada, é o ponto de partida de todas as cadeias."""
+        controle = controle if controle is not None else ControleBusca()
+        controle.iniciar(self.modelo.limite_inferior)
+        semente = self.modelo.rng.getrandbits(64)
+        if solucao_inicial is not None:
+            solucoes = [solucao_inicial for _ in range(n_ilhas)]
+        else:
+            solucoes = [self.modelo.gera_solucao_aleatoria() for _ in range(n_ilhas)]
+        resfriamento = self.resfriamento(solucoes[0], T_inicial, alpha, max_exec, iteracoes_reaquecimento)
+        resfriamentos = [copy.deepcopy(resfriamento) for _ in range(n_ilhas)]
+        for ilha, resfriamento_ilha in enumerate(resfriamentos):
+            resfriamento_ilha.T_inicial = resfriamento_ilha.T = resfriamento.T_inicial / 2 ** ilha
+        # Com seletor de operadores no modelo, cada ilha mantém o próprio, que retorna atualizado a cada migração
+        seletores = [None if self.modelo.seletor is None else copy.deepcopy(self.modelo.seletor) for _ in range(n_ilhas)]
+        melhor_solucao = min(solucoes, key=lambda solucao: solucao.M)
+        iteracoes = 0
+        iteracoes_convergencia = 0
+        controle.melhorou(melhor_solucao, iteracoes)
+
+        with ProcessPoolExecutor(max_workers=n_processos or n_ilhas) as executor:
+            epoca = 0
+            while iteracoes < max_exec and not all(r.esfriou() for r in resfriamentos) and not controle.encerrar(iteracoes, iteracoes_convergencia):
+                n_iteracoes = min(intervalo_migracao, max_exec - iteracoes)
+                tempo_restante = None if controle.prazo is None else controle.prazo - time.perf_counter()
+                futuros = [
+                    executor.submit(_recozer_ilha, f"{semente}:{ilha}:{epoca}", solucoes[ilha], resfriamentos[ilha], n_iteracoes, tempo_restante, seletores[ilha])
+                    for ilha in range(n_ilhas)
+                ]
+                resultados = [futuro.result() for futuro in futuros]
+
+                melhor_anterior = melhor_solucao
+                for ilha, (_, melhor_ilha, resfriamento_ilha, _, convergencia_ilha, seletor) in enumerate(resultados):
+                    resfriamentos[ilha] = resfriamento_ilha
+                    seletores[ilha] = seletor
+                    if melhor_ilha.M < melhor_solucao.M:
+                        melhor_solucao = melhor_ilha
+                        iteracoes_convergencia = iteracoes + convergencia_ilha
+                if melhor_solucao is not melhor_anterior:
+                    controle.melhorou(melhor_solucao, iteracoes_convergencia)
+
+                # Migração: a melhor solução global é o ponto de reinício de todas as ilhas
+                solucoes = [melhor_solucao for _ in range(n_ilhas)]
+                iteracoes += max(iteracoes_ilha for _, _, _, iteracoes_ilha, _, _ in resultados)
+                epoca += 1
+
         return melhor_solucao, iteracoes, iteracoes_convergencia
-    
-    def tabu_search(self, max_exec = 200, tamanho_tabu = 10) -> tuple[Solucao, int, int]:
-        solucao = self.modelo.gera_solucao_aleatoria()
+
+    def decomposicao(self, nome_heuristica = "tabu_search", max_exec = 2000, max_exec_polimento = None, n_grupos = None, lotes_por_grupo = 60, n_processos = None, controle: ControleBusca = None, solucao_inicial: Solucao = None, **parametros) -> tuple[Solucao, int, int]:
+        """Decomposição para instâncias grandes: os talhões são agrupados pelas distâncias DE e cada grupo recebe parte dos veículos e das
+        empilhadeiras (ver solver.decomposicao). Os subproblemas são resolvidos em processos separados pela heurística 'nome_heuristica'
+        (com os 'parametros'), partindo da solução gulosa de cada um, com até 'max_exec' iterações. As partes são então combinadas e a
+        solução completa é polida pela mesma heurística por até 'max_exec_polimento' iterações (max_exec / 2 por padrão), partindo da
+        melhor entre a combinada e a 'solucao_inicial'.
+        A busca tabu é o padrão porque, partindo da solução gulosa, melhora subproblemas de dezenas de lotes em poucas centenas de
+        iterações, enquanto o simulated annealing raramente sai dela nesse tamanho.
+        Por padrão, 'n_grupos' é nL / 'lotes_por_grupo', limitado pela metade dos veículos e pelo total de empilhadeiras; com um único grupo, a
+        heurística resolve a instância inteira.
+        Com tempo limite no 'controle', os subproblemas usam até 70% dele, dividido pelo total de rodadas em que os 'n_processos' processos
+        os resolvem. A solução gulosa (ou a 'solucao_inicial') e a combinada são notificadas ao 'controle' assim que obtidas, e o cancelamento
+        do 'controle' interrompe também os subproblemas e o polimento."""
+        controle = controle if controle is not None else ControleBusca()
+        dados = self.modelo.dados
+        max_exec_polimento = max_exec // 2 if max_exec_polimento is None else max_exec_polimento
+        if n_grupos is None:
+            n_grupos = math.ceil(dados.nL / lotes_por_grupo)
+        grupos = agrupar_talhoes(dados, min(n_grupos, dados.nV // 2, dados.nE))
+        if len(grupos) == 1:
+            if solucao_inicial is None:
+                solucao_inicial = self.modelo.gera_solucao_gulosa()
+            return getattr(self, nome_heuristica)(max_exec=max_exec, controle=controle, solucao_inicial=solucao_inicial, **parametros)
+
+        controle.iniciar(self.modelo.limite_inferior)
+        melhor_solucao = solucao_inicial if solucao_inicial is not None else self.modelo.gera_solucao_gulosa()
+        controle.melhorou(melhor_solucao, 0)
+
+        semente = self.modelo.rng.getrandbits(64)
+        subproblemas = dividir_instancia(dados, grupos)
+        n_processos = n_processos or len(subproblemas)
+        rodadas = math.ceil(len(subproblemas) / n_processos)
+        tempo_subproblemas = None if controle.tempo_limite is None else 0.7 * controle.tempo_limite / rodadas
+
+        # O evento, compartilhado com os processos, interrompe os subproblemas quando a busca é cancelada
+        interrupcao = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_subproblemas, initargs=(interrupcao,)) as executor:
+            futuros = [
+                executor.submit(_resolver_subproblema, f"{semente}:{g}", subproblema.dados, nome_heuristica, max_exec, tempo_subproblemas, self.modelo.seletor, parametros)
+                for g, subproblema in enumerate(subproblemas)
+            ]
+            while wait(futuros, timeout=0.05).not_done:
+                if controle.interrompido():
+                    interrupcao.set()
+            resultados = [futuro.result() for futuro in futuros]
+        iteracoes_subproblemas = max(iteracoes for _, iteracoes, _ in resultados)
+
+        solucao = self.modelo.reprogramar(combinar_solucoes(dados, subproblemas, [parte for parte, _, _ in resultados]))
+        if solucao.M < melhor_solucao.M:
+            melhor_solucao = solucao
+            controle.melhorou(melhor_solucao, iteracoes_subproblemas)
+        if controle.interrompido():
+            return melhor_solucao, iteracoes_subproblemas, iteracoes_subproblemas
+
+        # O polimento é uma etapa desta busca: respeita o prazo e o cancelamento do 'controle' e repassa a ele as novas melhores soluções
+        polimento = controle.etapa(iteracoes_subproblemas, melhor_solucao.M)
+        melhor_solucao, iteracoes, iteracoes_convergencia = getattr(self, nome_heuristica)(
+            max_exec=max_exec_polimento, controle=polimento, solucao_inicial=melhor_solucao, **parametros
+        )
+        return melhor_solucao, iteracoes_subproblemas + iteracoes, iteracoes_subproblemas + iteracoes_convergencia
+
+    def tabu_search(self, max_exec = 200, tamanho_tabu = 10, tamanho_vizinhanca = 100, max_iteracoes_sem_melhora = 250, controle: ControleBusca = None, solucao_inicial: Solucao = None) -> tuple[Solucao, int, int]:
+        """Busca tabu. A cada iteração são avaliados de uma vez 'tamanho_vizinhanca' movimentos sorteados da vizinhança (lista de candidatos),
+        e a busca termina após 'max_iteracoes_sem_melhora' iterações sem melhorar a melhor solução. O custo de cada iteração cresce com a lista
+        de candidatos: a vizinhança inteira ('tamanho_vizinhanca' None) tem da ordem de nL * (nL + nV) movimentos, cerca de mil em exp_30_01,
+        o que torna cada iteração dezenas de vezes mais cara. None em 'max_iteracoes_sem_melhora' desativa a parada por estagnação.
+        Com seletor de operadores no modelo, a vizinhança inclui trocas, or-opt, 2-opt e trocas de empilhadeiras (ver Modelo.listar_vizinhos)."""
+        controle = controle if controle is not None else ControleBusca()
+        controle.iniciar(self.modelo.limite_inferior)
+        solucao = solucao_inicial if solucao_inicial is not None else self.modelo.gera_solucao_aleatoria()
         melhor_solucao = solucao
         iteracoes = 0
         iteracoes_convergencia = 0
+        controle.melhorou(melhor_solucao, iteracoes)
+
+        # Atributos tabu (lote, k_old, k_new) -> iteração em que deixam de ser tabu
+        tabu = dict()
 
-        tabu_list = []
+        while iteracoes < max_exec and (max_iteracoes_sem_melhora is None or iteracoes - iteracoes_convergencia < max_iteracoes_sem_melhora) and not controle.encerrar(iteracoes, iteracoes_convergencia):
+            # Avalia a vizinhança inteira (ou uma amostra dela) de uma vez. Com seletor de operadores no modelo, a vizinhança é a de todos
+            # os operadores dele; sem seletor, apenas realocações e reatribuições de empilhadeira
+            if self.modelo.seletor is None:
+                movimentos = self.modelo.listar_movimentos(solucao, maximo=tamanho_vizinhanca)
+                makespans = self.modelo.avaliar_vizinhanca(solucao, movimentos)
+                vizinhos = [[movimento] for movimento in map(tuple, movimentos.tolist())]
+            else:
+                vizinhos = self.modelo.listar_vizinhos(solucao, self.modelo.seletor.operadores, maximo=tamanho_vizinhanca)
+                makespans = self.modelo.avaliar_vizinhos(solucao, vizinhos)
+            if len(vizinhos) == 0:
+                break
 
-        while iteracoes < max_exec:
-            nova_solucao = self.modelo.gera_solucao_vizinha(solucao, qtde_swaps=1)
+            # Vizinhos com algum movimento tabu são descartados, a não ser que melhorem a melhor solução (critério de aspiração)
+            tabu = {atributo: expiracao for atributo, expiracao in tabu.items() if expiracao > iteracoes}
+            for indice, movimentos in enumerate(vizinhos):
+                if makespans[indice] >= melhor_solucao.M and any((lote, k_old, k_new) in tabu for lote, k_old, k_new, _ in movimentos):
+                    makespans[indice] = math.inf
 
-            # Se a nova solução estiver na lista Tabu, a rejeitamos, a não ser que seja melhor que a solução atual
-            if nova_solucao in tabu_list and nova_solucao.M >= solucao.M:
-                continue
+            escolhido = int(np.argmin(makespans))
+            if makespans[escolhido] == math.inf:
+                # Todos os vizinhos são tabu ou inviáveis
+                break
 
-            solucao = nova_solucao
+            solucao = self.modelo.aplicar_movimentos(solucao, vizinhos[escolhido])
+
+            # Impede que os lotes voltem para os veículos de origem (e os talhões, para as empilhadeiras de origem) durante 'tamanho_tabu' iterações
+            for lote, k_old, k_new, _ in vizinhos[escolhido]:
+                tabu[(lote, k_new, k_old)] = iteracoes + tamanho_tabu + 1
 
             if solucao.M < melhor_solucao.M:
                 melhor_solucao = solucao
                 iteracoes_convergencia = iteracoes
+                controle.melhorou(melhor_solucao, iteracoes)
 
-            tabu_list.append(solucao)
+            if self.modelo.instrumentacao is not None:
+                self.modelo.instrumentacao.registrar_iteracao(solucao.M, True)
+            iteracoes += 1
 
-            # Se a lista Tabu atingir o tamanho máximo, remove a solução mais antiga
-            if len(tabu_list) > tamanho_tabu:
-                tabu_list.pop(0)
+        return melhor_solucao, iteracoes, iteracoes_convergencia
 
-            iteracoes += 1
+    def melhorias(self, nome_heuristica: str, controle: ControleBusca = None, **parametros) -> Iterator[tuple[Solucao, int]]:
+        """Executa a heurística 'nome_heuristica' em uma thread e gera cada nova melhor solução, com a iteração em que foi
+        encontrada, assim que ela surge. Interromper a iteração cancela a busca."""
+        controle = controle if controle is not None else ControleBusca()
+        fila = queue.Queue()
+
+        def notificar(solucao: Solucao, iteracoes: int) -> None:
+            controle.melhorou(solucao, iteracoes)
+            fila.put((solucao, iteracoes))
+
+        def executar() -> None:
+            try:
+                getattr(self, nome_heuristica)(controle=controle_thread, **parametros)
+                fila.put(None)
+            except Exception as erro:
+                fila.put(erro)
+
+        controle_thread = ControleBusca(controle.tempo_limite, controle.max_iteracoes_sem_melhora, notificar)
+        thread = threading.Thread(target=executar, daemon=True)
+        thread.start()
+        try:
+            while (item := fila.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            controle_thread.cancelar()
+            thread.join()
+
+# Evento de interrupção dos subproblemas da decomposição, em cada processo
+_interrupcao = None
+
+def _iniciar_subproblemas(interrupcao: multiprocessing.Event) -> None:
+    global _interrupcao
+    _interrupcao = interrupcao
+
+def _resolver_subproblema(semente: str, dados: Dados, nome_heuristica: str, max_exec: int, tempo_limite: float, seletor: SeletorOperadores, parametros: dict) -> tuple[Solucao, int, int]:
+    """Resolve um subproblema da decomposição (em um processo separado), partindo da solução gulosa. A busca é cancelada quando o evento
+    de interrupção é acionado."""
+    modelo = Modelo(dados, random.Random(semente), seletor=copy.deepcopy(seletor))
+    # A heurística inicia (e reinicia o cancelamento de) uma etapa do controle cancelado pelo evento
+    controle = ControleBusca(tempo_limite=tempo_limite)
+    controle.iniciar()
+    threading.Thread(target=lambda: _interrupcao.wait() and controle.cancelar(), daemon=True).start()
+    return getattr(Heuristica(modelo), nome_heuristica)(
+        max_exec=max_exec, controle=controle.etapa(), solucao_inicial=modelo.gera_solucao_gulosa(), **parametros
+    )
 
-        return melhor_solucao, iteracoes, iteracoes_convergencia
\ No newline at end of file
+def _recozer_ilha(semente: str, solucao: Solucao, resfriamento: Resfriamento, max_exec: int, tempo_limite: float, seletor: SeletorOperadores = None) -> tuple[Solucao, Solucao, Resfriamento, int, int, SeletorOperadores]:
+    """Executa um trecho de uma cadeia do modelo de ilhas (em um processo separado). Retorna também o seletor de operadores atualizado."""
+    heuristica = Heuristica(Modelo(solucao.dados, random.Random(semente), seletor=seletor))
+    controle = ControleBusca(tempo_limite=tempo_limite)
+    controle.iniciar(heuristica.modelo.limite_inferior)
+    return (*heuristica.recozer(solucao, resfriamento, max_exec, controle), seletor)
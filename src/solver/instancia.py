@@ -0,0 +1,80 @@
+import json
+import os
+import numpy as np
+from solver.dados import Dados
+
+def carregar_instancia(caminho: str) -> Dados:
+    """Carrega uma instância JSON, no formato denso (com a matriz 'LE') ou compacto (com a lista 'talhao_lote').
+    Os dados ficam também em um arquivo binário .npz ao lado do JSON, usado nas próximas cargas enquanto o JSON não for alterado."""
+    caminho_npz = os.path.splitext(caminho)[0] + ".npz"
+    if os.path.exists(caminho_npz) and os.path.getmtime(caminho_npz) >= os.path.getmtime(caminho):
+        try:
+            with np.load(caminho_npz) as npz:
+                return Dados(
+                    int(npz["nV"]), int(npz["nE"]), float(npz["TC"]), npz["T_ida"].tolist(),
+                    DE=npz["DE"].tolist(), talhao_lote=npz["talhao_lote"].tolist(), nT=int(npz["nT"]),
+                )
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Ignorando {caminho_npz}: {e}")
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = Dados(**json.load(f))
+
+    try:
+        salvar_npz(dados, caminho_npz)
+    except (OSError, ValueError) as e:
+        # ValueError: matrizes não retangulares (por exemplo, DE), que não cabem em um array
+        print(f"Não foi possível salvar {caminho_npz}: {e}")
+
+    return dados
+
+def salvar_npz(dados: Dados, caminho: str) -> None:
+    np.savez(
+        caminho,
+        nV=dados.nV, nE=dados.nE, nT=dados.nT, TC=dados.TC,
+        T_ida=np.asarray(dados.T_ida, dtype=np.float64),
+        DE=np.asarray(dados.DE, dtype=np.float64),
+        talhao_lote=np.asarray(dados.talhao_lote, dtype=np.int32),
+    )
+
+def salvar_instancia(dados: Dados, caminho: str) -> None:
+    """Salva a instância em JSON no formato compacto (lista 'talhao_lote' no lugar da matriz 'LE')."""
+    instancia = {
+        "nV": dados.nV,
+        "nE": dados.nE,
+        "nT": dados.nT,
+        "TC": dados.TC,
+        "T_ida": dados.T_ida,
+        "talhao_lote": dados.talhao_lote,
+        "DE": dados.DE,
+    }
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(instancia, f)
+
+def gerar_instancia(nL: int, nT: int, nV: int, nE: int, TC: float = 1.0, semente: int = 0) -> Dados:
+    """Gera uma instância sintética reproduzível pela semente.
+
+    Os talhões ficam a 0.5 até 2.5 horas da fábrica, em direções aleatórias. Os lotes são divididos entre os talhões
+    de forma desigual (cada talhão tem pelo menos um) e são numerados em sequência, talhão a talhão. O tempo de ida
+    de cada lote é o do seu talhão com uma variação de até 0.05 hora, e o deslocamento entre talhões é a distância
+    em linha reta entre eles, como nas instâncias de data/.
+    """
+    if nT < 1 or nL < nT:
+        raise ValueError("A instância precisa de pelo menos um talhão e de pelo menos um lote por talhão.")
+    if nV < 1 or nE < 1:
+        raise ValueError("A instância precisa de pelo menos um veículo e uma empilhadeira.")
+
+    rng = np.random.default_rng(semente)
+    distancia = rng.uniform(0.5, 2.5, nT)
+    angulo = rng.uniform(0.0, 2 * np.pi, nT)
+    posicao = np.column_stack((distancia * np.cos(angulo), distancia * np.sin(angulo)))
+
+    lotes_por_talhao = 1 + rng.multinomial(nL - nT, rng.dirichlet(np.full(nT, 2.0)))
+    talhao_lote = np.repeat(np.arange(1, nT + 1), lotes_por_talhao)
+    T_ida = np.maximum(0.1, distancia[talhao_lote - 1] + rng.uniform(-0.05, 0.05, nL))
+
+    # Os talhões virtuais (0 e nT + 1) não têm deslocamento
+    DE = np.zeros((nT + 2, nT + 2))
+    DE[1:-1, 1:-1] = np.linalg.norm(posicao[:, None, :] - posicao[None, :, :], axis=2)
+
+    return Dados(nV, nE, TC, np.round(T_ida, 2).tolist(), DE=np.round(DE, 2).tolist(), talhao_lote=talhao_lote.tolist())
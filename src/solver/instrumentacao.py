@@ -0,0 +1,77 @@
+import json
+import math
+import time
+import numpy as np
+
+class Instrumentacao:
+    """Coleta contadores, tempos e o traço das iterações de uma execução. Só é usada quando informada ao Modelo."""
+    MOTIVOS_REJEICAO = ("empilhadeira_ocupada", "sem_empilhadeira_livre")
+    TIPOS_REPARO = ("espera", "reatribuicao", "reordenacao")
+    CATEGORIAS_TEMPO = ("construcao", "avaliacao", "materializacao")
+
+    def __init__(self, capacidade_traco: int = 10000):
+        """Atributos:
+        ----------
+        - rejeicoes: Total de escolhas descartadas por motivo ('empilhadeira_ocupada': solução avaliada pelo decodificador é
+          inviável porque o impasse entre as empilhadeiras não pode ser desfeito; 'sem_empilhadeira_livre': nenhuma
+          empilhadeira pode se deslocar na construção aleatória).
+        - reparos: Total de conflitos de empilhadeira reparados na reprogramação dos vizinhos, por tipo ('espera': o veículo
+          aguarda a empilhadeira; 'reatribuicao': o talhão passa para uma empilhadeira livre; 'reordenacao': o veículo antecipa
+          um lote de um talhão em atendimento).
+        - tempos: Tempo acumulado, em segundos, na construção de soluções aleatórias, na avaliação de vizinhos e na
+          materialização dos vizinhos aceitos.
+        - traco_M, traco_T, traco_aceito: Arrays pré-alocados com o makespan da solução corrente, a temperatura (NaN fora do
+          simulated annealing) e se o vizinho foi aceito, em cada iteração. A capacidade dobra quando esgotada.
+        - total_iteracoes: Total de iterações registradas no traço.
+        """
+        self.rejeicoes = {motivo: 0 for motivo in self.MOTIVOS_REJEICAO}
+        self.reparos = {tipo: 0 for tipo in self.TIPOS_REPARO}
+        self.tempos = {categoria: 0.0 for categoria in self.CATEGORIAS_TEMPO}
+        self.traco_M = np.empty(capacidade_traco, dtype=np.float64)
+        self.traco_T = np.empty(capacidade_traco, dtype=np.float64)
+        self.traco_aceito = np.empty(capacidade_traco, dtype=np.bool_)
+        self.total_iteracoes = 0
+
+    @staticmethod
+    def relogio() -> float:
+        return time.perf_counter()
+
+    def acumular_tempo(self, categoria: str, inicio: float) -> None:
+        """Soma à categoria o tempo decorrido desde 'inicio' (obtido por 'relogio')."""
+        self.tempos[categoria] += time.perf_counter() - inicio
+
+    def registrar_rejeicao(self, motivo: str) -> None:
+        self.rejeicoes[motivo] += 1
+
+    def registrar_reparo(self, tipo: str) -> None:
+        self.reparos[tipo] += 1
+
+    def registrar_iteracao(self, M: float, aceito: bool, T: float = math.nan) -> None:
+        """Registra uma iteração da busca no traço."""
+        if self.total_iteracoes == len(self.traco_M):
+            capacidade = max(1, 2 * len(self.traco_M))
+            self.traco_M = np.resize(self.traco_M, capacidade)
+            self.traco_T = np.resize(self.traco_T, capacidade)
+            self.traco_aceito = np.resize(self.traco_aceito, capacidade)
+        self.traco_M[self.total_iteracoes] = M
+        self.traco_T[self.total_iteracoes] = T
+        self.traco_aceito[self.total_iteracoes] = aceito
+        self.total_iteracoes += 1
+
+    def exportar(self) -> dict:
+        """Retorna os dados coletados em um dicionário serializável em JSON."""
+        n = self.total_iteracoes
+        return {
+            "rejeicoes": dict(self.rejeicoes),
+            "reparos": dict(self.reparos),
+            "tempos": dict(self.tempos),
+            "traco": {
+                "M": self.traco_M[:n].tolist(),
+                "T": [None if math.isnan(T) else T for T in self.traco_T[:n].tolist()],
+                "aceito": self.traco_aceito[:n].tolist(),
+            },
+        }
+
+    def salvar(self, nome_arquivo: str) -> None:
+        with open(nome_arquivo, "w", encoding="utf-8") as f:
+            json.dump(self.exportar(), f, ensure_ascii=False, indent=4)
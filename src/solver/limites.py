@@ -0,0 +1,40 @@
+import math
+from solver.dados import Dados
+
+def limites_inferiores(dados: Dados) -> dict[str, float]:
+    """Limites inferiores do makespan (início do último atendimento), válidos para qualquer solução da instância:
+    - veiculos: cada veículo soma ida, carregamento e volta de todos os seus lotes, exceto carregamento e volta do último.
+      A soma desses tempos, descontadas as 'nV' maiores parcelas de carregamento e volta, é dividida entre os 'nV' veículos.
+    - empilhadeiras: a empilhadeira com mais lotes (ao menos os do maior talhão e ao menos nL / nE) carrega um lote após o outro,
+      a partir da primeira chegada possível de um veículo. Da mesma forma, a empilhadeira com mais talhões (ao menos nT / nE) carrega
+      ao menos os lotes dos menores talhões e se desloca entre eles.
+    - talhoes: o último lote de cada talhão começa ao menos LT[a] - 1 carregamentos após a primeira chegada possível ao talhão.
+    - chegada: todo lote começa após a ida do veículo até ele.
+    """
+    TC = dados.TC
+    ciclos = [ida + TC + volta for ida, volta in zip(dados.T_ida, dados.T_volta)]
+    retornos = sorted((TC + volta for volta in dados.T_volta), reverse=True)
+    lotes_empilhadeira = max(max(dados.LT), math.ceil(dados.nL / dados.nE))
+
+    talhoes = [a for a in dados.T if dados.lotes_talhao[a]]
+    talhoes_empilhadeira = math.ceil(len(talhoes) / dados.nE)
+    lotes_menores_talhoes = sum(sorted(dados.LT[a - 1] for a in talhoes)[:talhoes_empilhadeira])
+    deslocamento_minimo = min((dados.DE[a][b] for a in talhoes for b in talhoes if a != b), default=0.0)
+
+    return {
+        "veiculos": (sum(ciclos) - sum(retornos[:dados.nV])) / dados.nV,
+        "empilhadeiras": min(dados.T_ida) + max(
+            (lotes_empilhadeira - 1) * TC,
+            (lotes_menores_talhoes - 1) * TC + (talhoes_empilhadeira - 1) * deslocamento_minimo,
+        ),
+        "talhoes": max(min(dados.T_ida[i - 1] for i in dados.lotes_talhao[a]) + (dados.LT[a - 1] - 1) * TC for a in talhoes),
+        "chegada": max(dados.T_ida),
+    }
+
+def limite_inferior(dados: Dados) -> float:
+    """Maior dos limites inferiores de 'limites_inferiores'."""
+    return max(limites_inferiores(dados).values())
+
+def gap(makespan: float, limite: float) -> float:
+    """Gap de otimalidade relativo do makespan em relação ao limite inferior (0 quando a solução é comprovadamente ótima)."""
+    return (makespan - limite) / makespan if makespan > 0 else 0.0
@@ -1,231 +1,749 @@
+import heapq
+import math
 import random
-from copy import deepcopy
+from typing import Iterator
+import numpy as np
 from solver.dados import Dados
+from solver.decodificador import Decodificador
+from solver.estado import EstadoConstrucao
+from solver.instrumentacao import Instrumentacao
+from solver.limites import limite_inferior
+from solver.operadores import SeletorOperadores
 from solver.solucao import Solucao
 
 class Modelo:
     """Representa o modelo que rege o problema, incluido as respectivas restrições."""
-    def __init__(self, dados: Dados):
+    TAMANHO_BLOCO_VIZINHANCA = 2 ** 20 # total máximo de elementos (movimentos x lotes) avaliados de uma vez em 'avaliar_vizinhanca'
+    ESTRATEGIAS_GULOSAS = ("menor_termino", "talhao", "regret")
+
+    def __init__(self, dados: Dados, rng: random.Random = None, instrumentacao: Instrumentacao = None, seletor: SeletorOperadores = None):
+        """O gerador 'rng' concentra todas as escolhas aleatórias do modelo e das heurísticas, permitindo reproduzir uma execução pela semente.
+        A 'instrumentacao', quando informada, coleta rejeições, reparos, tempos e o traço das iterações.
+        O 'seletor', quando informado, escolhe o operador de cada vizinho sorteado; sem ele, os vizinhos são apenas realocações de lotes entre veículos.
+        O 'limite_inferior' do makespan da instância (ver solver.limites) permite às heurísticas encerrar a busca ao alcançá-lo."""
         self.dados = dados
+        self.rng = rng if rng is not None else random.Random()
+        self.instrumentacao = instrumentacao
+        self.seletor = seletor
+        self.decodificador = Decodificador(dados)
+        self.limite_inferior = limite_inferior(dados)
 
     def gera_solucao_aleatoria(self) -> Solucao:
         """Gera uma solução aleatória para o problema."""
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
         solucao = Solucao(self.dados)
+        estado = EstadoConstrucao(self.dados)
 
-        lotes_nao_atendidos = self.__get_lotes_nao_atendidos(solucao)
-        while lotes_nao_atendidos:
+        while estado.lotes_nao_atendidos:
             k = self.__selecionar_veiculo_aleatorio()
-            ultimo_lote_veiculo = self.__ultimo_lote_atendido_veiculo(k, solucao)
-            tempo_inicio_atendimento_ultimo_lote_veiculo = self.__get_tempo_inicio_atendimento_lote_veiculo(ultimo_lote_veiculo, k, solucao)
+            ultimo_lote_veiculo = self.__ultimo_lote_atendido_veiculo(k, estado)
+            tempo_inicio_atendimento_ultimo_lote_veiculo = self.__get_tempo_inicio_atendimento_ultimo_lote_veiculo(k, estado)
 
-            proximo_lote = self.__selecionar_proximo_lote_aleatorio(lotes_nao_atendidos)
+            proximo_lote = self.__selecionar_proximo_lote_aleatorio(estado.lotes_nao_atendidos)
             proximo_talhao = self.__get_talhao_from_lote(proximo_lote - 1)
 
-            e = self.__get_empilhadeira_talhao(proximo_talhao, solucao)
+            e = self.__get_empilhadeira_talhao(proximo_talhao, estado)
             if e is not None:
-                empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(proximo_talhao, solucao)
+                empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(proximo_talhao, estado)
                 empilhadeira_inicio_atendimento_proximo_lote = empilhadeira_inicio_atendimento_ultimo_lote + self.dados.TC
             else:
-                e = self.__selecionar_empilhadeira_livre(solucao)
-                if self.__empilhadeira_apta_deslocamento_talhao(e, solucao):          
-                    ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, solucao) or 0    
-                    empilhadeira_inicio_atendimento_proximo_lote = self.__get_tempo_chegada_proximo_talhao_empilhadeira(ultimo_talhao, proximo_talhao, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, solucao)
+                e = self.__selecionar_empilhadeira_livre(estado)
+                if self.__empilhadeira_apta_deslocamento_talhao(e, estado):          
+                    ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, estado) or 0    
+                    empilhadeira_inicio_atendimento_proximo_lote = self.__get_tempo_chegada_proximo_talhao_empilhadeira(ultimo_talhao, proximo_talhao, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, estado)
 
-                    self.__rotear_empilhadeira(e, ultimo_talhao, proximo_talhao, solucao)
+                    self.__rotear_empilhadeira(e, ultimo_talhao, proximo_talhao, solucao, estado)
                     self.__set_tempo_chegada_empilhadeira_talhao(e, proximo_talhao, empilhadeira_inicio_atendimento_proximo_lote, solucao)
                 else:
                     # Impossivel fazer o roteamento. É necessário fazer outra escolha de veículo e lote.
+                    if self.instrumentacao is not None:
+                        self.instrumentacao.registrar_rejeicao("sem_empilhadeira_livre")
                     continue
             
             self.__rotear_veiculo(k, ultimo_lote_veiculo, proximo_lote, solucao)
-            self.__atualizar_variaveis_temporais_veiculo(k, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, empilhadeira_inicio_atendimento_proximo_lote, solucao)
-
-            lotes_nao_atendidos.remove(proximo_lote)
-
-        # Os veiculos devem terminar na garagem
-        # Isso não gera nenhum impacto no resultado, apenas garante integridade
-        self.__rotear_veiculos_volta_garagem(solucao)
+            self.__atualizar_variaveis_temporais_veiculo(k, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, empilhadeira_inicio_atendimento_proximo_lote, solucao, estado)
 
         self.__atualizar_makespan(solucao)
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("construcao", inicio)
 
         return solucao
-    
-    def gera_solucao_vizinha(self, solucao: Solucao, maximo_tentativas: int = 100, qtde_swaps: int = 1) -> Solucao:
-        """Gera uma solução vizinha para o problema. Consiste no swap de lotes entre veículos."""
-        talhao_empilhadeira_dict = dict()
-        for talhao in self.dados.T:
-            talhao_empilhadeira_dict[talhao] = next(e for e in self.dados.E if solucao.Z[e - 1][talhao - 1] == 1)
 
-        sequencia_atendimento_veiculo_original = dict()
-        for k in self.dados.V:
-            sequencia_atendimento_veiculo_original[k] = sorted(
-            ((lote, solucao.H[lote - 1]) for lote in self.dados.L if solucao.S[k - 1][lote - 1] == 1),
-            key=lambda item: solucao.D[k - 1][item[0] - 1]
-        )
+    def gera_solucao_gulosa(self, estrategia: str = "menor_termino", alfa: float = 0.0, k_regret: int = 2) -> Solucao:
+        """Gera uma solução atendendo, a cada passo, o par (veículo, talhão) escolhido pela estratégia, com as mesmas regras de tempo
+        de 'gera_solucao_aleatoria'. No talhão escolhido é atendido o lote restante de menor tempo de ida.
+        - 'menor_termino': o par com o menor tempo de atendimento.
+        - 'talhao': como 'menor_termino', mas enquanto algum talhão em atendimento tiver lotes restantes, só esses talhões são considerados.
+        - 'regret': o talhão com o maior arrependimento (soma das diferenças entre o tempo de atendimento no melhor veículo e nos
+          'k_regret' - 1 veículos seguintes), atendido pelo melhor veículo.
+        Com 'alfa' > 0, a escolha é sorteada entre os candidatos a até 'alfa' vezes a amplitude dos valores do melhor (lista restrita de
+        candidatos do GRASP). Com 'alfa' = 0, a construção é determinística."""
+        if estrategia not in self.ESTRATEGIAS_GULOSAS:
+            raise ValueError(f"Estratégia gulosa desconhecida: {estrategia}.")
+
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
+        solucao = Solucao(self.dados)
+        estado = EstadoConstrucao(self.dados)
+        DE = np.asarray(self.dados.DE, dtype=np.float64)
+
+        # Lotes restantes de cada talhão, do maior para o menor tempo de ida (o próximo a ser atendido é o último)
+        restantes = [sorted(lotes, key=lambda i: (self.dados.T_ida[i - 1], i), reverse=True) for lotes in self.dados.lotes_talhao]
+        ida_proximo_lote = np.array([self.dados.T_ida[lotes[-1] - 1] if lotes else math.inf for lotes in restantes])
+
+        # Tempo a partir do qual cada veículo pode partir da fábrica para o próximo lote
+        partida_veiculo = np.zeros(self.dados.nV + 1)
+
+        while estado.lotes_nao_atendidos:
+            # Tempo de atendimento de cada par (veículo, talhão): chegada do veículo ou da empilhadeira, o que ocorrer depois
+            H = np.maximum(partida_veiculo[1:, None] + ida_proximo_lote[None, :], self.__inicio_empilhadeira_talhoes(DE, estado)[None, :])
+            if estrategia == "talhao":
+                em_atendimento = (np.asarray(estado.empilhadeira_talhao) > 0) & (ida_proximo_lote < math.inf)
+                if em_atendimento.any():
+                    H[:, ~em_atendimento] = math.inf
+
+            if estrategia == "regret":
+                viaveis = np.flatnonzero(H[0] < math.inf) # a viabilidade depende apenas do talhão
+                custos = np.sort(H[:, viaveis], axis=0)[:k_regret]
+                arrependimento = (custos[1:] - custos[0]).sum(axis=0)
+                # Maior arrependimento, desempatando pelo menor tempo de atendimento
+                ordem = np.lexsort((custos[0], -arrependimento))
+                talhao = int(self.__selecionar_candidato(viaveis[ordem], -arrependimento[ordem], alfa))
+                k = int(np.argmin(H[:, talhao])) + 1
+            else:
+                viaveis = np.flatnonzero(H < math.inf)
+                viaveis = viaveis[np.argsort(H.flat[viaveis], kind="stable")]
+                k, talhao = divmod(int(self.__selecionar_candidato(viaveis, H.flat[viaveis], alfa)), H.shape[1])
+                k += 1
 
-        if len(sequencia_atendimento_veiculo_original) < 2:
-            raise ValueError("Não é possível gerar uma solução vizinha com menos de dois veículos.")
+            proximo_lote = restantes[talhao].pop()
+            ida_proximo_lote[talhao] = self.dados.T_ida[restantes[talhao][-1] - 1] if restantes[talhao] else math.inf
 
-        # Loop força encontrar uma solução vizinha
-        lotes_nao_atendidos = [0] # Apenas para entrar no loop
-        tentativas = 0
-        while lotes_nao_atendidos and tentativas < maximo_tentativas:
-            sol_vizinha = Solucao(self.dados)
-            sequencia_atendimento_veiculo = deepcopy(sequencia_atendimento_veiculo_original)
-
-            # 1) Passo 1: Pegar o lote de um veiculo e colocar em outro, de forma aleatória.
-            for _ in range(qtde_swaps):
-                k_old = random.choice([k for k in self.dados.V if len(sequencia_atendimento_veiculo[k]) > 0])
-                k_new = random.choice([k for k in self.dados.V if k != k_old])
-
-                lote_swap = random.choice(sequencia_atendimento_veiculo[k_old])
-                sequencia_atendimento_veiculo[k_old].remove(lote_swap)
-                posicao_swap = random.choice(range(len(sequencia_atendimento_veiculo[k_new]) + 1))
-                sequencia_atendimento_veiculo[k_new].insert(posicao_swap, lote_swap)
-
-            # 2) Passo 2: Chamar um metodo similar a gera_solucao_aleatoria para recalcular a solução. 
-            # A diferença é que agora a sequência de atendimento já está definida. 
-            # Caso não seja possivel, alterar a posição do novo lote a ser atendido e rodar novamente.
-            lotes_nao_atendidos = self.__get_lotes_nao_atendidos(sol_vizinha)
-            while lotes_nao_atendidos:
-                k = min((k for k in sequencia_atendimento_veiculo.keys()), key=lambda k: sequencia_atendimento_veiculo[k][0][1] if sequencia_atendimento_veiculo[k] else float('inf'))
-                ultimo_lote_veiculo = self.__ultimo_lote_atendido_veiculo(k, sol_vizinha)
-                tempo_inicio_atendimento_ultimo_lote_veiculo = self.__get_tempo_inicio_atendimento_lote_veiculo(ultimo_lote_veiculo, k, sol_vizinha)
-
-                lote_tempo = sequencia_atendimento_veiculo[k][0]
-                proximo_lote = lote_tempo[0]
-                proximo_talhao = self.__get_talhao_from_lote(proximo_lote - 1)
-
-                e = self.__get_empilhadeira_talhao(proximo_talhao, sol_vizinha)
-                if e is None:
-                    e = talhao_empilhadeira_dict[proximo_talhao]
-                    if self.__empilhadeira_apta_deslocamento_talhao(e, sol_vizinha):          
-                        ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, sol_vizinha) or 0    
-                        empilhadeira_inicio_atendimento_proximo_lote = self.__get_tempo_chegada_proximo_talhao_empilhadeira(ultimo_talhao, proximo_talhao, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, sol_vizinha)
-
-                        self.__rotear_empilhadeira(e, ultimo_talhao, proximo_talhao, sol_vizinha)
-                        self.__set_tempo_chegada_empilhadeira_talhao(e, proximo_talhao, empilhadeira_inicio_atendimento_proximo_lote, sol_vizinha)
-                    else:
-                        # Impossivel fazer o roteamento. É necessário fazer outro swap.
-                        break
-                else:
-                    empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(proximo_talhao, sol_vizinha)
-                    empilhadeira_inicio_atendimento_proximo_lote = empilhadeira_inicio_atendimento_ultimo_lote + self.dados.TC
-                
-                self.__rotear_veiculo(k, ultimo_lote_veiculo, proximo_lote, sol_vizinha)
-                self.__atualizar_variaveis_temporais_veiculo(k, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, empilhadeira_inicio_atendimento_proximo_lote, sol_vizinha)
+            ultimo_lote_veiculo = self.__ultimo_lote_atendido_veiculo(k, estado)
+            tempo_inicio_atendimento_ultimo_lote_veiculo = self.__get_tempo_inicio_atendimento_ultimo_lote_veiculo(k, estado)
 
-                sequencia_atendimento_veiculo[k].remove(lote_tempo)
-                lotes_nao_atendidos.remove(proximo_lote)
+            e = self.__get_empilhadeira_talhao(talhao, estado)
+            if e is not None:
+                empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(talhao, estado)
+                empilhadeira_inicio_atendimento_proximo_lote = empilhadeira_inicio_atendimento_ultimo_lote + self.dados.TC
+            else:
+                e = self.__selecionar_empilhadeira_mais_proxima(talhao, estado)
+                ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, estado) or 0
+                empilhadeira_inicio_atendimento_proximo_lote = self.__get_tempo_chegada_proximo_talhao_empilhadeira(ultimo_talhao, talhao, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, estado)
 
-            tentativas += 1
+                self.__rotear_empilhadeira(e, ultimo_talhao, talhao, solucao, estado)
+                self.__set_tempo_chegada_empilhadeira_talhao(e, talhao, empilhadeira_inicio_atendimento_proximo_lote, solucao)
 
-        if lotes_nao_atendidos:
-            raise ValueError("Não foi possível gerar uma solução vizinha.")
-        
-        # Os veiculos devem terminar na garagem
-        # Isso não gera nenhum impacto no resultado, apenas garante integridade
-        self.__rotear_veiculos_volta_garagem(sol_vizinha)
+            self.__rotear_veiculo(k, ultimo_lote_veiculo, proximo_lote, solucao)
+            self.__atualizar_variaveis_temporais_veiculo(k, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, empilhadeira_inicio_atendimento_proximo_lote, solucao, estado)
+            partida_veiculo[k] = estado.inicio_ultimo_lote_veiculo[k] + self.dados.TC + self.dados.T_volta[proximo_lote - 1]
 
+        self.__atualizar_makespan(solucao)
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("construcao", inicio)
+
+        return solucao
+    
+    def gera_solucao_vizinha(self, solucao: Solucao, qtde_swaps: int = 1) -> Solucao:
+        """Gera uma solução vizinha para o problema (ver 'gera_movimento_vizinho')."""
+        movimentos, _ = self.gera_movimento_vizinho(solucao, qtde_swaps)
+        return self.aplicar_movimentos(solucao, movimentos)
+
+    def gera_movimento_vizinho(self, solucao: Solucao, qtde_swaps: int = 1) -> tuple[list, float]:
+        """Sorteia 'qtde_swaps' aplicações do operador escolhido pelo seletor (realocação, sem seletor) e retorna os movimentos e o makespan
+        do vizinho, sem materializar a solução. Os operadores são:
+        - 'realocacao': move um lote para outra posição de outro veículo.
+        - 'troca': troca dois lotes de veículos diferentes.
+        - 'or_opt': move um trecho de até 3 lotes para outra posição do mesmo veículo.
+        - 'dois_opt': inverte um trecho da sequência de um veículo.
+        - 'reatribuicao_empilhadeira': passa um talhão para outra empilhadeira.
+        - 'troca_empilhadeiras': troca as empilhadeiras de dois talhões, alterando a ordem de atendimento de ambas.
+        Cada movimento é uma realocação (lote, k_old, k_new, posicao), com k_old igual a k_new nos movimentos dentro de um veículo, ou
+        uma reatribuição (-talhao, e_old, e_new, 0) de empilhadeira. Operadores que não se aplicam à solução são substituídos pela realocação.
+        Todo sorteio gera um vizinho viável, pois os conflitos de empilhadeira são reparados durante a reprogramação."""
+        if self.dados.nV < 2:
+            raise ValueError("Não é possível gerar uma solução vizinha com menos de dois veículos.")
+
+        movimentos = self.__sortear_movimentos(solucao, qtde_swaps)
+        return movimentos, self.avaliar_movimentos(solucao, movimentos)
+
+    def avaliar_movimentos(self, solucao: Solucao, movimentos: list) -> float:
+        """Retorna o makespan do vizinho obtido ao aplicar os movimentos em 'solucao'. Apenas os atendimentos a partir do primeiro afetado são reprogramados."""
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
+        sequencias, empilhadeira_talhao, corte = self.__aplicar_movimentos_sequencias(solucao, movimentos)
+        estado = EstadoConstrucao.a_partir_da_solucao(solucao, corte)
+        self.__reprogramar_atendimentos(solucao, sequencias, empilhadeira_talhao, corte, estado)
+
+        # O último lote de cada veículo é o de maior tempo de atendimento
+        M = max(estado.inicio_ultimo_lote_veiculo)
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("avaliacao", inicio)
+        return M
+
+    def aplicar_movimentos(self, solucao: Solucao, movimentos: list) -> Solucao:
+        """Materializa a solução vizinha obtida ao aplicar os movimentos em 'solucao', reaproveitando os atendimentos anteriores ao primeiro afetado."""
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
+        sequencias, empilhadeira_talhao, corte = self.__aplicar_movimentos_sequencias(solucao, movimentos)
+        estado = EstadoConstrucao.a_partir_da_solucao(solucao, corte)
+
+        # Os tempos dos lotes reprogramados são sobrescritos durante a reprogramação
+        sol_vizinha = Solucao(self.dados)
+        sol_vizinha.B = solucao.B[:]
+        sol_vizinha.D = solucao.D[:]
+        sol_vizinha.W = solucao.W[:]
+        sol_vizinha.H = solucao.H[:]
+        sol_vizinha.C = solucao.C[:]
+        for e, sequencia in enumerate(solucao.sequencia_empilhadeira):
+            sol_vizinha.sequencia_empilhadeira[e] = [a for a in sequencia if estado.lotes_atendidos_talhao[a] > 0]
+
+        self.__reprogramar_atendimentos(solucao, sequencias, empilhadeira_talhao, corte, estado, sol_vizinha)
         self.__atualizar_makespan(sol_vizinha)
-        
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("materializacao", inicio)
+
         return sol_vizinha
-        
-    def __get_lotes_nao_atendidos(self, solucao: Solucao) -> list:
-        """Retorna uma lista de lotes ainda não atendidos."""
-        lotes_atendidos = set()
-        for v in self.dados.V:
-            for l in self.dados.L:
-                if solucao.S[v - 1][l - 1] == 1:
-                    lotes_atendidos.add(l - 1)
-        
-        return [lote for lote in self.dados.L if lote - 1 not in lotes_atendidos]
+
+    def codificar(self, solucao: Solucao) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Codifica a solução nos arrays (lotes, inicio_veiculo, empilhadeira_talhao, prioridade) aceitos por 'avaliar'. A prioridade são os
+        tempos H da solução, que definem a ordem em que os veículos são programados: 'avaliar(*codificar(solucao))' reproduz o makespan dela."""
+        lotes, inicio_veiculo = self.decodificador.codificar(solucao.sequencia_veiculo)
+        empilhadeira_talhao = np.zeros(self.dados.nT + 2, dtype=np.intp)
+        for e, sequencia in enumerate(solucao.sequencia_empilhadeira, start=1):
+            empilhadeira_talhao[sequencia] = e
+        return lotes, inicio_veiculo, empilhadeira_talhao, np.array(solucao.H, dtype=np.float64)
+
+    def reprogramar(self, solucao: Solucao) -> Solucao:
+        """Reconstrói o cronograma completo a partir das sequências dos veículos e das empilhadeiras de 'solucao', programando os
+        veículos na ordem dos tempos H. Permite montar uma solução a partir de partes resolvidas separadamente (ver solver.decomposicao)."""
+        nova_solucao = Solucao(self.dados)
+        estado = EstadoConstrucao(self.dados)
+        self.__reprogramar_atendimentos(solucao, solucao.sequencia_veiculo, self.__empilhadeira_talhao(solucao), -math.inf, estado, nova_solucao)
+        self.__atualizar_makespan(nova_solucao)
+        return nova_solucao
+
+    def avaliar(self, lotes: np.ndarray, inicio_veiculo: np.ndarray, empilhadeira_talhao: np.ndarray, prioridade: np.ndarray = None,
+                B: np.ndarray = None, W: np.ndarray = None, H: np.ndarray = None, C: np.ndarray = None) -> float:
+        """Retorna o makespan da solução codificada, sem construir uma Solucao, com as mesmas regras de espera e de reparo da reprogramação
+        dos vizinhos. Ver Decodificador.avaliar."""
+        if self.instrumentacao is None:
+            return self.decodificador.avaliar(lotes, inicio_veiculo, empilhadeira_talhao, prioridade, B, W, H, C)
+
+        inicio = Instrumentacao.relogio()
+        M = self.decodificador.avaliar(lotes, inicio_veiculo, empilhadeira_talhao, prioridade, B, W, H, C)
+        if M == math.inf:
+            self.instrumentacao.registrar_rejeicao("empilhadeira_ocupada")
+        self.instrumentacao.acumular_tempo("avaliacao", inicio)
+        return M
+
+    def listar_movimentos(self, solucao: Solucao, maximo: int = None) -> np.ndarray:
+        """Lista os movimentos da vizinhança de 'solucao' como um array (m, 4) no formato de 'gera_movimento_vizinho': todas as realocações
+        de um lote para qualquer posição de qualquer veículo (inclusive o próprio) e todas as reatribuições de um talhão para outra empilhadeira.
+        Caso 'maximo' seja informado, retorna uma amostra aleatória desse tamanho."""
+        blocos = []
+        for k_old in self.dados.V:
+            sequencia_old = solucao.sequencia_veiculo[k_old - 1]
+            for k_new in self.dados.V:
+                if not sequencia_old:
+                    continue
+                if k_old == k_new:
+                    # Dentro do veículo, todas as posições exceto a atual
+                    n = len(sequencia_old)
+                    bloco = np.empty((n * n, 4), dtype=np.intp)
+                    bloco[:, 0] = np.repeat(sequencia_old, n)
+                    bloco[:, 1] = k_old
+                    bloco[:, 2] = k_new
+                    bloco[:, 3] = np.tile(np.arange(n), n)
+                    blocos.append(bloco[bloco[:, 3] != np.repeat(np.arange(n), n)])
+                    continue
+                n_new = len(solucao.sequencia_veiculo[k_new - 1])
+                bloco = np.empty((len(sequencia_old) * (n_new + 1), 4), dtype=np.intp)
+                bloco[:, 0] = np.repeat(sequencia_old, n_new + 1)
+                bloco[:, 1] = k_old
+                bloco[:, 2] = k_new
+                bloco[:, 3] = np.tile(np.arange(n_new + 1), len(sequencia_old))
+                blocos.append(bloco)
+
+        for e_old, sequencia in enumerate(solucao.sequencia_empilhadeira, start=1):
+            for e_new in self.dados.E:
+                if e_new != e_old and sequencia:
+                    blocos.append(np.array([(-talhao, e_old, e_new, 0) for talhao in sequencia], dtype=np.intp))
+
+        movimentos = np.concatenate(blocos) if blocos else np.empty((0, 4), dtype=np.intp)
+        if maximo is not None and maximo < len(movimentos):
+            movimentos = movimentos[sorted(self.rng.sample(range(len(movimentos)), maximo))]
+
+        return movimentos
+
+    def avaliar_vizinhanca(self, solucao: Solucao, movimentos: np.ndarray) -> np.ndarray:
+        """Retorna o array com o makespan do vizinho gerado por cada movimento (linha) de 'movimentos', avaliando todos de uma vez por
+        Decodificador.avaliar_lote com a prioridade de 'solucao'. Os valores coincidem com os de 'avaliar_movimentos' para cada movimento isolado."""
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
+        lotes, inicio_veiculo, empilhadeira_talhao, prioridade = self.codificar(solucao)
+
+        # Posição de cada lote em 'lotes'
+        posicao_lote = np.empty(self.dados.nL + 1, dtype=np.intp)
+        posicao_lote[lotes] = np.arange(self.dados.nL)
+        j = np.arange(self.dados.nL)[None, :]
+        veiculos = np.arange(self.dados.nV + 1)[None, :]
+
+        # Os movimentos são avaliados em blocos, limitando a memória das matrizes (movimentos x lotes) em instâncias grandes
+        makespans = np.empty(len(movimentos), dtype=np.float64)
+        tamanho_bloco = max(1, self.TAMANHO_BLOCO_VIZINHANCA // self.dados.nL)
+        for inicio_bloco in range(0, len(movimentos), tamanho_bloco):
+            bloco = movimentos[inicio_bloco:inicio_bloco + tamanho_bloco]
+
+            # As reatribuições de empilhadeira mantêm as sequências (o primeiro lote é "movido" para a própria posição) e alteram
+            # apenas a empilhadeira do talhão
+            reatribuicao = bloco[:, 0] < 0
+            lote = np.where(reatribuicao, lotes[0], bloco[:, 0])
+            k_old = np.where(reatribuicao, 1, bloco[:, 1])
+            k_new = np.where(reatribuicao, 1, bloco[:, 2])
+            posicao = np.where(reatribuicao, 0, bloco[:, 3])
+            empilhadeiras = np.repeat(empilhadeira_talhao[None, :], len(bloco), axis=0)
+            linhas = np.flatnonzero(reatribuicao)
+            empilhadeiras[linhas, -bloco[linhas, 0]] = bloco[linhas, 2]
+
+            # Posição do lote movido em 'lotes' e posição em que ele é inserido após a remoção
+            origem = posicao_lote[lote]
+            destino = inicio_veiculo[k_new - 1] - (k_old < k_new) + posicao
+
+            # Cada linha de 'lotes_vizinhos' é 'lotes' sem a posição 'origem' e com o lote inserido em 'destino'
+            reduzido = np.where(j < destino[:, None], j, j - 1)
+            lotes_vizinhos = lotes[np.where(reduzido < origem[:, None], reduzido, reduzido + 1)]
+            lotes_vizinhos[j == destino[:, None]] = lote
+
+            inicio_veiculo_vizinhos = inicio_veiculo[None, :] - (veiculos >= k_old[:, None]) + (veiculos >= k_new[:, None])
+
+            makespans[inicio_bloco:inicio_bloco + len(bloco)] = self.decodificador.avaliar_lote(lotes_vizinhos, inicio_veiculo_vizinhos, empilhadeiras, prioridade)
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("avaliacao", inicio)
+        return makespans
+
+    def listar_vizinhos(self, solucao: Solucao, operadores: tuple, maximo: int = None) -> list[list]:
+        """Lista os vizinhos de 'solucao' gerados pelos 'operadores' (ver 'gera_movimento_vizinho' e SeletorOperadores.OPERADORES), cada
+        um como a sua lista de movimentos: todas as aplicações de cada operador ou, caso 'maximo' seja informado, 'maximo' aplicações de
+        operadores sorteados. Vizinhos repetidos são descartados."""
+        empilhadeira_talhao = self.__empilhadeira_talhao(solucao)
+        vizinhos = {}
+        if maximo is not None:
+            for _ in range(maximo):
+                sequencia_atendimento_veiculo = {k: list(solucao.sequencia_veiculo[k - 1]) for k in self.dados.V}
+                _, movimentos = self.__sortear_operador(self.rng.choice(operadores), sequencia_atendimento_veiculo, list(empilhadeira_talhao))
+                vizinhos.setdefault(tuple(movimentos), movimentos)
+            return list(vizinhos.values())
+
+        for operador in operadores:
+            for movimentos in self.__enumerar_operador(operador, solucao, empilhadeira_talhao):
+                vizinhos.setdefault(tuple(movimentos), movimentos)
+        return list(vizinhos.values())
+
+    def avaliar_vizinhos(self, solucao: Solucao, vizinhos: list[list]) -> np.ndarray:
+        """Retorna o array com o makespan de cada vizinho de 'vizinhos' (listas de movimentos, como as de 'listar_vizinhos'), avaliando todos
+        de uma vez por Decodificador.avaliar_lote com a prioridade de 'solucao'. Ao contrário de 'avaliar_vizinhanca', aceita vizinhos de vários
+        movimentos, cujas codificações são montadas uma a uma. Os valores coincidem com os de 'avaliar_movimentos' para cada vizinho."""
+        inicio = Instrumentacao.relogio() if self.instrumentacao is not None else 0.0
+        prioridade = np.array(solucao.H, dtype=np.float64)
+
+        makespans = np.empty(len(vizinhos), dtype=np.float64)
+        tamanho_bloco = max(1, self.TAMANHO_BLOCO_VIZINHANCA // self.dados.nL)
+        for inicio_bloco in range(0, len(vizinhos), tamanho_bloco):
+            bloco = vizinhos[inicio_bloco:inicio_bloco + tamanho_bloco]
+            lotes = np.empty((len(bloco), self.dados.nL), dtype=np.intp)
+            inicio_veiculo = np.empty((len(bloco), self.dados.nV + 1), dtype=np.intp)
+            empilhadeiras = np.empty((len(bloco), self.dados.nT + 2), dtype=np.intp)
+            for linha, movimentos in enumerate(bloco):
+                sequencias, empilhadeiras[linha], _ = self.__aplicar_movimentos_sequencias(solucao, movimentos)
+                lotes[linha], inicio_veiculo[linha] = self.decodificador.codificar(sequencias)
+
+            makespans[inicio_bloco:inicio_bloco + len(bloco)] = self.decodificador.avaliar_lote(lotes, inicio_veiculo, empilhadeiras, prioridade)
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.acumular_tempo("avaliacao", inicio)
+        return makespans
+
+    def __sortear_movimentos(self, solucao: Solucao, qtde_swaps: int) -> list:
+        """Passo 1: Sortear os movimentos do operador escolhido, aplicando-os em cópias das sequências dos veículos e das empilhadeiras dos talhões."""
+        sequencia_atendimento_veiculo = {k: list(solucao.sequencia_veiculo[k - 1]) for k in self.dados.V}
+        empilhadeira_talhao = self.__empilhadeira_talhao(solucao)
+        operador = "realocacao" if self.seletor is None else self.seletor.sortear(self.rng)
+
+        movimentos = []
+        for _ in range(qtde_swaps):
+            operador, movimentos_operador = self.__sortear_operador(operador, sequencia_atendimento_veiculo, empilhadeira_talhao)
+            movimentos.extend(movimentos_operador)
+
+        if self.seletor is not None:
+            self.seletor.ultimo = operador
+        return movimentos
+
+    def __sortear_operador(self, operador: str, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> tuple[str, list]:
+        """Sorteia uma aplicação do 'operador' sobre as sequências e as empilhadeiras informadas, alterando-as. Retorna o operador
+        aplicado, que é a realocação quando o 'operador' não se aplica à solução (por exemplo, há uma única empilhadeira), e os movimentos."""
+        sorteios = {
+            "realocacao": self.__sortear_realocacao,
+            "troca": self.__sortear_troca,
+            "or_opt": self.__sortear_or_opt,
+            "dois_opt": self.__sortear_dois_opt,
+            "reatribuicao_empilhadeira": self.__sortear_reatribuicao_empilhadeira,
+            "troca_empilhadeiras": self.__sortear_troca_empilhadeiras,
+        }
+        movimentos = sorteios[operador](sequencia_atendimento_veiculo, empilhadeira_talhao)
+        if movimentos is None:
+            return "realocacao", self.__sortear_realocacao(sequencia_atendimento_veiculo, empilhadeira_talhao)
+        return operador, movimentos
+
+    def __sortear_realocacao(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Pegar o lote de um veiculo e colocar em outro, de forma aleatória."""
+        k_old = self.rng.choice([k for k in self.dados.V if len(sequencia_atendimento_veiculo[k]) > 0])
+        k_new = self.rng.choice([k for k in self.dados.V if k != k_old])
+
+        lote_swap = self.rng.choice(sequencia_atendimento_veiculo[k_old])
+        sequencia_atendimento_veiculo[k_old].remove(lote_swap)
+        posicao_swap = self.rng.choice(range(len(sequencia_atendimento_veiculo[k_new]) + 1))
+        sequencia_atendimento_veiculo[k_new].insert(posicao_swap, lote_swap)
+        return [(lote_swap, k_old, k_new, posicao_swap)]
+
+    def __sortear_troca(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Trocar dois lotes de veículos diferentes, cada um ocupando a posição do outro."""
+        veiculos = [k for k in self.dados.V if sequencia_atendimento_veiculo[k]]
+        if len(veiculos) < 2:
+            return None
+        k1, k2 = self.rng.sample(veiculos, 2)
+        p1 = self.rng.randrange(len(sequencia_atendimento_veiculo[k1]))
+        p2 = self.rng.randrange(len(sequencia_atendimento_veiculo[k2]))
+        a = sequencia_atendimento_veiculo[k1][p1]
+        b = sequencia_atendimento_veiculo[k2][p2]
+        sequencia_atendimento_veiculo[k1][p1], sequencia_atendimento_veiculo[k2][p2] = b, a
+
+        # Ao entrar no veículo k2 na posição p2, 'a' empurra 'b' para p2 + 1; ao sair, 'b' libera a posição p2 para 'a'
+        return [(a, k1, k2, p2), (b, k2, k1, p1)]
+
+    def __sortear_or_opt(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Mover um trecho de 1 a 3 lotes consecutivos para outra posição do mesmo veículo."""
+        veiculos = [k for k in self.dados.V if len(sequencia_atendimento_veiculo[k]) >= 2]
+        if not veiculos:
+            return None
+        k = self.rng.choice(veiculos)
+        sequencia = sequencia_atendimento_veiculo[k]
+        tamanho = self.rng.randint(1, min(3, len(sequencia) - 1))
+        i = self.rng.randrange(len(sequencia) - tamanho + 1)
+        trecho = sequencia[i:i + tamanho]
+        restante = sequencia[:i] + sequencia[i + tamanho:]
+        j = self.rng.choice([posicao for posicao in range(len(restante) + 1) if posicao != i])
+        return self.__reordenar_veiculo(k, sequencia_atendimento_veiculo, restante[:j] + trecho + restante[j:])
+
+    def __sortear_dois_opt(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Inverter o trecho entre duas posições da sequência de um veículo."""
+        veiculos = [k for k in self.dados.V if len(sequencia_atendimento_veiculo[k]) >= 2]
+        if not veiculos:
+            return None
+        k = self.rng.choice(veiculos)
+        sequencia = sequencia_atendimento_veiculo[k]
+        i, j = sorted(self.rng.sample(range(len(sequencia)), 2))
+        return self.__reordenar_veiculo(k, sequencia_atendimento_veiculo, sequencia[:i] + sequencia[i:j + 1][::-1] + sequencia[j + 1:])
+
+    def __sortear_reatribuicao_empilhadeira(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Passar um talhão para outra empilhadeira."""
+        if self.dados.nE < 2:
+            return None
+        talhao = self.rng.choice([a for a in self.dados.T if self.dados.lotes_talhao[a]])
+        e_old = empilhadeira_talhao[talhao]
+        e_new = self.rng.choice([e for e in self.dados.E if e != e_old])
+        empilhadeira_talhao[talhao] = e_new
+        return [(-talhao, e_old, e_new, 0)]
+
+    def __sortear_troca_empilhadeiras(self, sequencia_atendimento_veiculo: dict, empilhadeira_talhao: list) -> list:
+        """Trocar as empilhadeiras de dois talhões atendidos por empilhadeiras diferentes."""
+        talhoes = [a for a in self.dados.T if self.dados.lotes_talhao[a]]
+        a = self.rng.choice(talhoes)
+        candidatos = [b for b in talhoes if empilhadeira_talhao[b] != empilhadeira_talhao[a]]
+        if not candidatos:
+            return None
+        b = self.rng.choice(candidatos)
+        e_a, e_b = empilhadeira_talhao[a], empilhadeira_talhao[b]
+        empilhadeira_talhao[a], empilhadeira_talhao[b] = e_b, e_a
+        return [(-a, e_a, e_b, 0), (-b, e_b, e_a, 0)]
+
+    def __enumerar_operador(self, operador: str, solucao: Solucao, empilhadeira_talhao: list) -> Iterator[list]:
+        """Gera todas as aplicações do 'operador' em 'solucao', cada uma como a lista de movimentos que o sorteio do operador retornaria."""
+        sequencias = {k: solucao.sequencia_veiculo[k - 1] for k in self.dados.V}
+        talhoes = [a for a in self.dados.T if self.dados.lotes_talhao[a]]
+        if operador == "realocacao":
+            for k_old in self.dados.V:
+                for lote in sequencias[k_old]:
+                    for k_new in self.dados.V:
+                        if k_new != k_old:
+                            for posicao in range(len(sequencias[k_new]) + 1):
+                                yield [(lote, k_old, k_new, posicao)]
+        elif operador == "troca":
+            for k1 in self.dados.V:
+                for k2 in self.dados.V:
+                    if k2 > k1:
+                        for p1, a in enumerate(sequencias[k1]):
+                            for p2, b in enumerate(sequencias[k2]):
+                                yield [(a, k1, k2, p2), (b, k2, k1, p1)]
+        elif operador == "or_opt":
+            for k in self.dados.V:
+                sequencia = sequencias[k]
+                for tamanho in range(1, min(3, len(sequencia) - 1) + 1):
+                    for i in range(len(sequencia) - tamanho + 1):
+                        trecho = sequencia[i:i + tamanho]
+                        restante = sequencia[:i] + sequencia[i + tamanho:]
+                        for j in range(len(restante) + 1):
+                            if j != i:
+                                yield self.__reordenar_veiculo(k, {k: sequencia}, restante[:j] + trecho + restante[j:])
+        elif operador == "dois_opt":
+            for k in self.dados.V:
+                sequencia = sequencias[k]
+                for i in range(len(sequencia)):
+                    for j in range(i + 1, len(sequencia)):
+                        yield self.__reordenar_veiculo(k, {k: sequencia}, sequencia[:i] + sequencia[i:j + 1][::-1] + sequencia[j + 1:])
+        elif operador == "reatribuicao_empilhadeira":
+            for talhao in talhoes:
+                for e_new in self.dados.E:
+                    if e_new != empilhadeira_talhao[talhao]:
+                        yield [(-talhao, empilhadeira_talhao[talhao], e_new, 0)]
+        elif operador == "troca_empilhadeiras":
+            for a in talhoes:
+                for b in talhoes:
+                    if b > a and empilhadeira_talhao[b] != empilhadeira_talhao[a]:
+                        yield [(-a, empilhadeira_talhao[a], empilhadeira_talhao[b], 0), (-b, empilhadeira_talhao[b], empilhadeira_talhao[a], 0)]
+        else:
+            raise ValueError(f"Operador desconhecido: {operador}.")
+
+    def __reordenar_veiculo(self, k: int, sequencia_atendimento_veiculo: dict, nova_sequencia: list) -> list:
+        """Substitui a sequência do veículo 'k' por 'nova_sequencia' (uma permutação dela) e retorna as realocações dentro do veículo que fazem essa troca."""
+        sequencia = list(sequencia_atendimento_veiculo[k])
+        movimentos = []
+        for posicao, lote in enumerate(nova_sequencia):
+            if sequencia[posicao] != lote:
+                sequencia.remove(lote)
+                sequencia.insert(posicao, lote)
+                movimentos.append((lote, k, k, posicao))
+        sequencia_atendimento_veiculo[k] = sequencia
+        return movimentos
+
+    def __empilhadeira_talhao(self, solucao: Solucao) -> list:
+        """Retorna a lista com a empilhadeira de cada talhão em 'solucao' (indexada pelo talhão, 0 nos talhões sem atendimento)."""
+        empilhadeira_talhao = [0 for _ in range(self.dados.nT + 2)]
+        for e, sequencia in enumerate(solucao.sequencia_empilhadeira, start=1):
+            for talhao in sequencia:
+                empilhadeira_talhao[talhao] = e
+        return empilhadeira_talhao
+
+    def __aplicar_movimentos_sequencias(self, solucao: Solucao, movimentos: list) -> tuple[list, list, float]:
+        """Aplica os movimentos nas sequências dos veículos e na empilhadeira de cada talhão e retorna ambas junto do tempo de corte:
+        todo lote atendido antes dele mantém seus tempos no vizinho."""
+        sequencias = list(solucao.sequencia_veiculo) # apenas as sequências alteradas são copiadas
+        empilhadeira_talhao = self.__empilhadeira_talhao(solucao)
+        copiadas = set()
+        corte = math.inf
+        for lote, k_old, k_new, posicao in movimentos:
+            if lote < 0:
+                # Reatribuição de empilhadeira: a reprogramação só diverge ao iniciar o atendimento do talhão
+                talhao = -lote
+                empilhadeira_talhao[talhao] = k_new
+                corte = min(corte, min(solucao.H[i - 1] for i in self.dados.lotes_talhao[talhao]))
+                continue
+
+            for k in (k_old, k_new):
+                if k not in copiadas:
+                    sequencias[k - 1] = list(sequencias[k - 1])
+                    copiadas.add(k)
+
+            sequencias[k_old - 1].remove(lote)
+            sequencias[k_new - 1].insert(posicao, lote)
+
+            # A reprogramação segue a ordem dos tempos originais. Ela só diverge ao alcançar o lote movido
+            # ou o lote que passou a sucedê-lo no novo veículo.
+            corte = min(corte, solucao.H[lote - 1])
+            if posicao + 1 < len(sequencias[k_new - 1]):
+                corte = min(corte, solucao.H[sequencias[k_new - 1][posicao + 1] - 1])
+
+        return sequencias, empilhadeira_talhao, corte
+
+    def __reprogramar_atendimentos(self, solucao: Solucao, sequencias: list, empilhadeira_talhao: list, corte: float, estado: EstadoConstrucao, sol_vizinha: Solucao = None) -> None:
+        """Passo 2: Recalcula os atendimentos com início a partir de 'corte', seguindo as sequências e as empilhadeiras dos talhões já definidas.
+        Os tempos só são gravados quando 'sol_vizinha' é informada. Os reparos são contados na instrumentação apenas sem 'sol_vizinha', de forma que
+        um vizinho avaliado e depois materializado seja contado uma única vez.
+
+        Quando a empilhadeira de um talhão ainda não iniciado está ocupada em outro talhão, o veículo aguarda até que alguma empilhadeira
+        finalize o talhão atual. Caso todos os veículos restantes estejam aguardando, o impasse é desfeito por '__desfazer_impasse'.
+        Assim, a reprogramação sempre atende todos os lotes, podendo alterar 'sequencias' e 'empilhadeira_talhao'."""
+        contar_reparos = self.instrumentacao is not None and sol_vizinha is None
+
+        # A fila de prioridade guarda o tempo original do próximo lote de cada veículo, evitando percorrer todos a cada passo.
+        posicao_veiculo = {k: 0 for k in self.dados.V}
+        fila_veiculos = []
+        for k in self.dados.V:
+            sequencia = sequencias[k - 1]
+            while posicao_veiculo[k] < len(sequencia) and solucao.H[sequencia[posicao_veiculo[k]] - 1] < corte:
+                posicao_veiculo[k] += 1
+            if sol_vizinha is not None:
+                sol_vizinha.sequencia_veiculo[k - 1] = sequencia[:posicao_veiculo[k]]
+            if posicao_veiculo[k] < len(sequencia):
+                fila_veiculos.append((solucao.H[sequencia[posicao_veiculo[k]] - 1], k))
+        heapq.heapify(fila_veiculos)
+        aguardando = [] # veículos cujo próximo talhão depende de uma empilhadeira ocupada
+
+        while fila_veiculos or aguardando:
+            if not fila_veiculos:
+                self.__desfazer_impasse(sequencias, posicao_veiculo, aguardando, empilhadeira_talhao, estado, contar_reparos)
+                fila_veiculos, aguardando = aguardando, []
+                continue
+
+            _, k = fila_veiculos[0]
+            ultimo_lote_veiculo = self.__ultimo_lote_atendido_veiculo(k, estado)
+            tempo_inicio_atendimento_ultimo_lote_veiculo = self.__get_tempo_inicio_atendimento_ultimo_lote_veiculo(k, estado)
+
+            proximo_lote = sequencias[k - 1][posicao_veiculo[k]]
+            proximo_talhao = self.__get_talhao_from_lote(proximo_lote - 1)
+
+            e = self.__get_empilhadeira_talhao(proximo_talhao, estado)
+            if e is None:
+                e = empilhadeira_talhao[proximo_talhao]
+                if self.__empilhadeira_apta_deslocamento_talhao(e, estado):          
+                    ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, estado) or 0    
+                    empilhadeira_inicio_atendimento_proximo_lote = self.__get_tempo_chegada_proximo_talhao_empilhadeira(ultimo_talhao, proximo_talhao, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, estado)
+
+                    self.__rotear_empilhadeira(e, ultimo_talhao, proximo_talhao, sol_vizinha, estado)
+                    self.__set_tempo_chegada_empilhadeira_talhao(e, proximo_talhao, empilhadeira_inicio_atendimento_proximo_lote, sol_vizinha)
+                else:
+                    # A empilhadeira ainda não finalizou o talhão atual: o veículo aguarda
+                    if contar_reparos:
+                        self.instrumentacao.registrar_reparo("espera")
+                    aguardando.append(heapq.heappop(fila_veiculos))
+                    continue
+            else:
+                empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(proximo_talhao, estado)
+                empilhadeira_inicio_atendimento_proximo_lote = empilhadeira_inicio_atendimento_ultimo_lote + self.dados.TC
+            
+            self.__rotear_veiculo(k, ultimo_lote_veiculo, proximo_lote, sol_vizinha)
+            self.__atualizar_variaveis_temporais_veiculo(k, ultimo_lote_veiculo, proximo_lote, tempo_inicio_atendimento_ultimo_lote_veiculo, empilhadeira_inicio_atendimento_proximo_lote, sol_vizinha, estado)
+
+            posicao_veiculo[k] += 1
+            if posicao_veiculo[k] < len(sequencias[k - 1]):
+                heapq.heapreplace(fila_veiculos, (solucao.H[sequencias[k - 1][posicao_veiculo[k]] - 1], k))
+            else:
+                heapq.heappop(fila_veiculos)
+
+            # A empilhadeira do talhão finalizado fica livre para os veículos que aguardavam
+            if aguardando and estado.talhao_finalizado(proximo_talhao):
+                for item in aguardando:
+                    heapq.heappush(fila_veiculos, item)
+                aguardando.clear()
+
+    def __desfazer_impasse(self, sequencias: list, posicao_veiculo: dict, aguardando: list, empilhadeira_talhao: list, estado: EstadoConstrucao,
+                           contar_reparos: bool = False) -> None:
+        """Desfaz o impasse em que todos os veículos restantes aguardam empilhadeiras ocupadas, ordenando 'aguardando' como fila de prioridade.
+        Havendo empilhadeira livre, ela passa a atender o talhão do primeiro veículo da fila (ver '__selecionar_empilhadeira_mais_proxima').
+        Caso contrário, o primeiro veículo que ainda tem lotes de um talhão em atendimento passa a atender um deles em seguida."""
+        aguardando.sort()
+        if any(estado.empilhadeira_livre(e) for e in self.dados.E):
+            _, k = aguardando[0]
+            talhao = self.__get_talhao_from_lote(sequencias[k - 1][posicao_veiculo[k]] - 1)
+            empilhadeira_talhao[talhao] = self.__selecionar_empilhadeira_mais_proxima(talhao, estado)
+            if contar_reparos:
+                self.instrumentacao.registrar_reparo("reatribuicao")
+            return
+
+        # Todas as empilhadeiras estão em talhões com lotes restantes, que necessariamente estão nas sequências dos veículos que aguardam
+        for _, k in aguardando:
+            sequencia = sequencias[k - 1]
+            for posicao in range(posicao_veiculo[k] + 1, len(sequencia)):
+                if estado.empilhadeira_talhao[self.__get_talhao_from_lote(sequencia[posicao] - 1)]:
+                    sequencia = sequencias[k - 1] = list(sequencia) # a sequência pode ser compartilhada com a solução original
+                    sequencia.insert(posicao_veiculo[k], sequencia.pop(posicao))
+                    if contar_reparos:
+                        self.instrumentacao.registrar_reparo("reordenacao")
+                    return
         
     def __selecionar_veiculo_aleatorio(self) -> int:
         """Seleciona um veículo aleatório."""
-        return random.choice([k for k in self.dados.V])
+        return self.rng.choice(self.dados.V)
     
-    def __ultimo_lote_atendido_veiculo(self, k: int, solucao: Solucao) -> int:
+    def __ultimo_lote_atendido_veiculo(self, k: int, estado: EstadoConstrucao) -> int:
         """Encontra o ultimo lote atendido pelo veiculo 'k'"""
-        return max((lote for lote in self.dados.L if solucao.S[k - 1][lote - 1] == 1), key=lambda lote: solucao.B[k - 1][lote - 1], default=0)
+        return estado.ultimo_lote_veiculo[k]
     
-    def __get_tempo_inicio_atendimento_lote_veiculo(self, i: int, k: int, solucao: Solucao) -> float:
-        """Retorna o tempo de inicio de atendimento do lote pelo veículo 'k'"""
-        return solucao.D[k -1][i - 1]
+    def __get_tempo_inicio_atendimento_ultimo_lote_veiculo(self, k: int, estado: EstadoConstrucao) -> float:
+        """Retorna o tempo de inicio de atendimento do ultimo lote atendido pelo veículo 'k'"""
+        return estado.inicio_ultimo_lote_veiculo[k]
 
     def __selecionar_proximo_lote_aleatorio(self, lotes_permitidos: list) -> int:
         """Escolhe o próximo lote a ser atendido baseado na lista permitida."""
-        return random.choice(lotes_permitidos)
+        return self.rng.choice(lotes_permitidos)
     
     def __get_talhao_from_lote(self, i: int) -> int:
         """Retorna o talhão que o lote está contido."""
-        for a in self.dados.T:
-            if self.dados.LE[a][i] == 1:
-                return a
-            
-        return None
+        return self.dados.talhao_lote[i]
     
-    def __get_empilhadeira_talhao(self, talhao: int, solucao: Solucao) -> int:
+    def __get_empilhadeira_talhao(self, talhao: int, estado: EstadoConstrucao) -> int:
         """Retorna a empilhadeira 'e' que está atendendo o talhão"""
-        return next((e for e in self.dados.E if solucao.C[e - 1][talhao] != 0), None)
+        return estado.empilhadeira_talhao[talhao] or None
     
-    def __get_tempo_inicio_atendimento_ultimo_lote(self, talhao: int, solucao: Solucao) -> float:
+    def __get_tempo_inicio_atendimento_ultimo_lote(self, talhao: int, estado: EstadoConstrucao) -> float:
         "Retorna o tempo de inicio de atendimento do ultimo lote com base no talhão"
-        return max(solucao.H[i - 1] for i in self.dados.L if self.__get_talhao_from_lote(i - 1) == talhao)
+        return estado.inicio_ultimo_lote_talhao[talhao]
     
-    def __selecionar_empilhadeira_livre(self, solucao: Solucao) -> int:
+    def __inicio_empilhadeira_talhoes(self, DE: np.ndarray, estado: EstadoConstrucao) -> np.ndarray:
+        """Retorna, para cada talhão, o tempo mínimo em que uma empilhadeira pode iniciar o atendimento do próximo lote: após o lote anterior
+        nos talhões em atendimento e na chegada da empilhadeira livre mais próxima nos demais (-inf caso alguma ainda não tenha atendido,
+        pois ela acompanha o veículo, e inf caso nenhuma esteja livre)."""
+        inicio_ultimo_lote_talhao = np.asarray(estado.inicio_ultimo_lote_talhao)
+        inicio = np.full(self.dados.nT + 2, math.inf)
+        livres = [estado.talhao_empilhadeira[e] for e in self.dados.E if estado.empilhadeira_livre(e)]
+        if 0 in livres:
+            inicio[:] = -math.inf
+        elif livres:
+            # Em algumas instâncias, DE não inclui o talhão virtual final
+            inicio[:DE.shape[1]] = ((inicio_ultimo_lote_talhao[livres] + self.dados.TC)[:, None] + DE[livres]).min(axis=0)
+
+        iniciados = np.asarray(estado.empilhadeira_talhao) > 0
+        inicio[iniciados] = inicio_ultimo_lote_talhao[iniciados] + self.dados.TC
+        return inicio
+
+    def __selecionar_candidato(self, candidatos: np.ndarray, valores: np.ndarray, alfa: float):
+        """Retorna o primeiro candidato ('candidatos' ordenados por 'valores', do melhor para o pior) ou, com 'alfa' > 0, um candidato sorteado
+        entre os de valor até 'alfa' vezes a amplitude dos valores acima do melhor."""
+        if alfa <= 0:
+            return candidatos[0]
+        limite = valores[0] + alfa * (valores[-1] - valores[0])
+        return candidatos[self.rng.randrange(int(np.searchsorted(valores, limite, side="right")))]
+
+    def __selecionar_empilhadeira_mais_proxima(self, talhao: int, estado: EstadoConstrucao) -> int:
+        """Seleciona, entre as empilhadeiras livres, uma que ainda não atendeu nenhum talhão ou, caso não haja, a que chega mais cedo ao talhão."""
+        livres = [e for e in self.dados.E if estado.empilhadeira_livre(e)]
+        for e in livres:
+            if self.__is_primeiro_atendimento_empilhadeira(e, estado):
+                return e
+        return min(livres, key=lambda e: estado.inicio_ultimo_lote_talhao[estado.talhao_empilhadeira[e]] + self.dados.DE[estado.talhao_empilhadeira[e]][talhao])
+
+    def __selecionar_empilhadeira_livre(self, estado: EstadoConstrucao) -> int:
         """Seleciona uma empilhadeira que não atendeu nenhum talhão ainda ou alguma que já finalizou. Ambas de forma aleatória."""
-        empilhadeiras_nao_atenderam = [e for e in self.dados.E if self.__ultimo_talhao_atendido_empilhadeira(e, solucao) is None]
+        empilhadeiras_nao_atenderam = [e for e in self.dados.E if self.__is_primeiro_atendimento_empilhadeira(e, estado)]
         if empilhadeiras_nao_atenderam:
-            return random.choice(empilhadeiras_nao_atenderam)
+            return self.rng.choice(empilhadeiras_nao_atenderam)
 
-        empilhadeiras_candidatas = [e for e in self.dados.E if self.__todos_lotes_atendidos(e, solucao)]
+        empilhadeiras_candidatas = [e for e in self.dados.E if estado.empilhadeira_livre(e)]
         if len(empilhadeiras_candidatas) == 0:
             return None
         
-        return random.choice(empilhadeiras_candidatas)
+        return self.rng.choice(empilhadeiras_candidatas)
     
-    def __empilhadeira_apta_deslocamento_talhao(self, e: int, solucao: Solucao) -> bool:
+    def __empilhadeira_apta_deslocamento_talhao(self, e: int, estado: EstadoConstrucao) -> bool:
         """Verifica se a empilhadeira 'e' pode se deslocar para outro talhão."""
-        return e is not None and (self.__is_primeiro_atendimento_empilhadeira(e, solucao) or self.__todos_lotes_atendidos(e, solucao))
+        return e is not None and estado.empilhadeira_livre(e)
     
-    def __is_primeiro_atendimento_empilhadeira(self, e: int, solucao: Solucao) -> bool:
+    def __is_primeiro_atendimento_empilhadeira(self, e: int, estado: EstadoConstrucao) -> bool:
         """Verifica se a empilhadeira ainda não atendeu nenhum lote."""
-        return self.__ultimo_talhao_atendido_empilhadeira(e, solucao) is None  
-    
-    def __todos_lotes_atendidos(self, e: int, solucao: Solucao) -> bool:
-        """Verifica se a empilhadeira 'e' atendeu todos os lotes do seu ultimo talhão."""
-        ultimo_talhao = self.__ultimo_talhao_atendido_empilhadeira(e, solucao)
-        return ultimo_talhao not in self.__selecionar_talhoes_iniciados_nao_finalizados(solucao)
-    
-    def __selecionar_talhoes_iniciados_nao_finalizados(self, solucao: Solucao) -> set:
-        """Talhões em que o atendimento já começou, mas ainda não finalizou"""
-        talhoes_iniciados = self.__get_talhoes_iniciados(solucao)
-        return {
-                talhao
-                for talhao in talhoes_iniciados
-                if sum(
-                    solucao.S[v - 1][l - 1] == 1
-                        for v in self.dados.V
-                            for l in self.dados.L
-                                if self.__get_talhao_from_lote(l - 1) == talhao
-                ) != self.dados.LT[talhao - 1]
-            }
+        return self.__ultimo_talhao_atendido_empilhadeira(e, estado) is None  
     
-    def __get_talhoes_iniciados(self, solucao: Solucao) -> set:
-        """Talhões em que o atendimento já começou."""
-        return {
-                self.__get_talhao_from_lote(l - 1)
-                    for v in self.dados.V
-                        for l in self.dados.L
-                            if solucao.S[v - 1][l - 1] == 1
-            }
-    
-    def __ultimo_talhao_atendido_empilhadeira(self, e: int, solucao: Solucao) -> int:
+    def __ultimo_talhao_atendido_empilhadeira(self, e: int, estado: EstadoConstrucao) -> int:
         """Encontra o ultimo talhão atendido pela empilhadeira 'e'"""
-        return max((talhao for talhao in self.dados.T if solucao.Z[e - 1][talhao - 1] == 1), key=lambda talhao: solucao.C[e - 1][talhao], default=None)
+        return estado.talhao_empilhadeira[e] or None
     
-    def __get_tempo_chegada_proximo_talhao_empilhadeira(self, ultimo_talhao: int, proximo_talhao: int, ultimo_lote_veiculo: int, proximo_lote: int, tempo_inicio_atendimento_ultimo_lote_veiculo: float, solucao: Solucao) -> float:
+    def __get_tempo_chegada_proximo_talhao_empilhadeira(self, ultimo_talhao: int, proximo_talhao: int, ultimo_lote_veiculo: int, proximo_lote: int, tempo_inicio_atendimento_ultimo_lote_veiculo: float, estado: EstadoConstrucao) -> float:
         """Retorna o tempo de chegada da empilhadeira no próximo talhão a ser atendido"""
         if ultimo_talhao == 0: # primeiro atendimento da empilhadeira
             if ultimo_lote_veiculo == 0: # primeiro atendimento do veiculo
@@ -233,42 +751,42 @@ class Modelo:
             else:
                 tempo_chegada_proximo_talhao = tempo_inicio_atendimento_ultimo_lote_veiculo + self.dados.TC + self.dados.T_volta[ultimo_lote_veiculo - 1] + self.dados.T_ida[proximo_lote - 1]
         else:
-            empilhadeira_inicio_atendimento_ultimo_lote = max(solucao.H[i -1] for i in self.dados.L if self.__get_talhao_from_lote(i - 1) == ultimo_talhao)
+            empilhadeira_inicio_atendimento_ultimo_lote = self.__get_tempo_inicio_atendimento_ultimo_lote(ultimo_talhao, estado)
             tempo_chegada_proximo_talhao = empilhadeira_inicio_atendimento_ultimo_lote + self.dados.TC + self.dados.DE[ultimo_talhao][proximo_talhao]
 
         return tempo_chegada_proximo_talhao
     
-    def __rotear_empilhadeira(self, e: int, a: int, b: int, solucao: Solucao) -> None:
-        """Preenche as variáveis Y[e][a][b] e Z[e][b] com os respectivos indices."""
-        solucao.Y[e - 1][a][b] = 1
-        solucao.Z[e - 1][b - 1] = 1
+    def __rotear_empilhadeira(self, e: int, a: int, b: int, solucao: Solucao, estado: EstadoConstrucao) -> None:
+        """Inclui o talhão 'b' na sequência da empilhadeira 'e', logo após 'a' (variáveis Y[e][a][b] e Z[e][b])."""
+        if solucao is not None:
+            solucao.sequencia_empilhadeira[e - 1].append(b)
+        estado.registrar_empilhadeira(e, b)
 
     def __set_tempo_chegada_empilhadeira_talhao(self, e: int, talhao: int, tempo: float, solucao: Solucao) -> None:
-        """Preenche a variável C[e][b], representando o tempo de chegada da empilhadeira no talhao."""
-        solucao.C[e - 1][talhao] = tempo
+        """Preenche a variável C[a], representando o tempo de chegada da empilhadeira 'e' no talhao."""
+        if solucao is not None:
+            solucao.C[talhao] = tempo
     
     def __rotear_veiculo(self, k: int, i: int, j: int, solucao: Solucao) -> None:
-        """Preenche as variáveis X[k][i][j] e S[k][j] com os respectivos indices."""
-        solucao.X[k - 1][i][j] = 1
-        solucao.S[k - 1][j - 1] = 1
+        """Inclui o lote 'j' na sequência do veículo 'k', logo após 'i' (variáveis X[k][i][j] e S[k][j])."""
+        if solucao is not None:
+            solucao.sequencia_veiculo[k - 1].append(j)
 
-    def __atualizar_variaveis_temporais_veiculo(self, k: int, ultimo_lote_veiculo: int, proximo_lote: int, tempo_inicio_atendimento_ultimo_lote_veiculo: float, empilhadeira_inicio_atendimento_proximo_lote: float, solucao: Solucao) -> None:
-        """Preenche as variáveis B[k][i], W[k][i], D[k][i] e H[i], representando os tempos de chegada, atraso e atendimento do veículo 'k', respectivamente"""
+    def __atualizar_variaveis_temporais_veiculo(self, k: int, ultimo_lote_veiculo: int, proximo_lote: int, tempo_inicio_atendimento_ultimo_lote_veiculo: float, empilhadeira_inicio_atendimento_proximo_lote: float, solucao: Solucao, estado: EstadoConstrucao) -> None:
+        """Preenche as variáveis B[i], W[i], D[i] e H[i], representando os tempos de chegada, atraso e atendimento do veículo 'k', respectivamente"""
         if ultimo_lote_veiculo == 0: # garagem
             tempo_minimo_chegada_proximo_lote = self.dados.T_ida[proximo_lote - 1]
         else:
             tempo_minimo_chegada_proximo_lote = tempo_inicio_atendimento_ultimo_lote_veiculo + self.dados.TC + self.dados.T_volta[ultimo_lote_veiculo - 1] + self.dados.T_ida[proximo_lote - 1]
 
-        solucao.B[k - 1][proximo_lote - 1] = tempo_minimo_chegada_proximo_lote
-        solucao.W[k - 1][proximo_lote - 1] = max(0, empilhadeira_inicio_atendimento_proximo_lote - tempo_minimo_chegada_proximo_lote)  # Tempo de espera do veículo
-        solucao.D[k - 1][proximo_lote - 1] = tempo_minimo_chegada_proximo_lote + solucao.W[k - 1][proximo_lote - 1]
-        solucao.H[proximo_lote - 1] = solucao.D[k - 1][proximo_lote - 1]
-
-    def __rotear_veiculos_volta_garagem(self, solucao: Solucao) -> None:
-        """Preenche a variável X[k][i][nL + 1], representando a volta do veiculo para garagem."""
-        for k in self.dados.V:
-            i = self.__ultimo_lote_atendido_veiculo(k, solucao) or 0
-            solucao.X[k - 1][i][self.dados.nL + 1] = 1
+        tempo_espera = max(0, empilhadeira_inicio_atendimento_proximo_lote - tempo_minimo_chegada_proximo_lote)  # Tempo de espera do veículo
+        tempo_inicio_atendimento = tempo_minimo_chegada_proximo_lote + tempo_espera
+        if solucao is not None:
+            solucao.B[proximo_lote - 1] = tempo_minimo_chegada_proximo_lote
+            solucao.W[proximo_lote - 1] = tempo_espera
+            solucao.D[proximo_lote - 1] = tempo_inicio_atendimento
+            solucao.H[proximo_lote - 1] = tempo_inicio_atendimento
+        estado.registrar_atendimento(k, proximo_lote, tempo_inicio_atendimento)
 
     def __atualizar_makespan(self, solucao: Solucao) -> None:
         """Atualiza a variável makespan 'M'."""
@@ -0,0 +1,46 @@
+import random
+
+class SeletorOperadores:
+    """Seleção adaptativa dos operadores de vizinhança: roleta com pesos que acompanham as recompensas recentes de cada operador."""
+    OPERADORES = ("realocacao", "troca", "or_opt", "dois_opt", "reatribuicao_empilhadeira", "troca_empilhadeiras")
+    RECOMPENSAS = {"melhor": 10.0, "melhora": 4.0, "aceito": 1.0, "rejeitado": 0.0}
+
+    def __init__(self, operadores: tuple = OPERADORES, reacao: float = 0.05, peso_minimo: float = 0.1):
+        """Atributos:
+        ----------
+        - operadores: Operadores sorteados (ver Modelo.gera_movimento_vizinho).
+        - reacao: Fração do peso substituída pela recompensa a cada uso (0 mantém os pesos iniciais).
+        - peso_minimo: Peso mínimo de cada operador, de forma que nenhum deixe de ser sorteado.
+        - pesos: Peso atual de cada operador (inicialmente 1).
+        - usos, sucessos: Total de vezes em que cada operador foi usado e em que gerou um vizinho melhor que a solução corrente.
+        - ultimo: Último operador usado, que recebe a próxima recompensa.
+        """
+        self.operadores = tuple(operadores)
+        self.reacao = reacao
+        self.peso_minimo = peso_minimo
+        self.pesos = {operador: 1.0 for operador in self.operadores}
+        self.usos = {operador: 0 for operador in self.operadores}
+        self.sucessos = {operador: 0 for operador in self.operadores}
+        self.ultimo = None
+
+    def sortear(self, rng: random.Random) -> str:
+        """Sorteia um operador com probabilidade proporcional ao peso."""
+        self.ultimo = rng.choices(self.operadores, weights=[self.pesos[operador] for operador in self.operadores])[0]
+        return self.ultimo
+
+    def recompensar(self, resultado: str) -> None:
+        """Atualiza o peso do último operador usado conforme o resultado do vizinho ('melhor': nova melhor solução; 'melhora': melhor que
+        a solução corrente; 'aceito': aceito sem melhorar; 'rejeitado')."""
+        if self.ultimo is None:
+            return
+        self.usos[self.ultimo] += 1
+        if resultado in ("melhor", "melhora"):
+            self.sucessos[self.ultimo] += 1
+        peso = (1 - self.reacao) * self.pesos[self.ultimo] + self.reacao * self.RECOMPENSAS[resultado]
+        self.pesos[self.ultimo] = max(self.peso_minimo, peso)
+
+    def estatisticas(self) -> dict:
+        return {
+            operador: {"peso": self.pesos[operador], "usos": self.usos[operador], "sucessos": self.sucessos[operador]}
+            for operador in self.operadores
+        }
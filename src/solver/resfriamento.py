@@ -0,0 +1,77 @@
+import math
+
+class Resfriamento:
+    """Esquema de temperatura do simulated annealing.
+    Com 'alpha', a temperatura cai geometricamente a cada iteração (esquema fixo). Sem ele, a cada 'janela' pioras propostas a temperatura
+    é corrigida para que a taxa de aceitação das pioras acompanhe uma taxa alvo, que cai geometricamente de 'aceitacao_inicial' a
+    'aceitacao_final' ao longo de 'horizonte' iterações. Nos dois esquemas, após 'iteracoes_reaquecimento' iterações sem melhora
+    a temperatura corrente é multiplicada por 'fator_reaquecimento', sem passar de 'T_inicial'. O reaquecimento não reinicia a queda
+    da taxa alvo, de modo que a busca continua esfriando ao longo do horizonte."""
+    def __init__(self, T_inicial: float, horizonte: int, alpha: float = None, aceitacao_inicial: float = 0.2, aceitacao_final: float = 0.005,
+                 janela: int = 50, iteracoes_reaquecimento: int = None, fator_reaquecimento: float = 1.5, T_minimo: float = 0.01):
+        """Atributos:
+        ----------
+        - T_inicial, T: Temperaturas inicial e corrente.
+        - horizonte: Iterações previstas para a busca, ao longo das quais a taxa alvo cai.
+        - alpha: Fator de resfriamento do esquema fixo (None para o esquema adaptativo).
+        - aceitacao_inicial, aceitacao_final: Taxas alvo de aceitação das pioras no início e no fim do horizonte.
+        - janela: Pioras propostas entre duas correções da temperatura.
+        - iteracoes_reaquecimento: Iterações sem melhora até o reaquecimento (None desativa o reaquecimento).
+        - fator_reaquecimento: Multiplicador da temperatura corrente ao reaquecer.
+        - T_minimo: Temperatura em que a busca do esquema fixo termina.
+        - iteracoes, iteracoes_sem_melhora, reaquecimentos: Contadores da busca.
+        - pioras, pioras_aceitas: Pioras propostas e aceitas na janela corrente.
+        """
+        self.T_inicial = T_inicial
+        self.T = T_inicial
+        self.horizonte = max(1, horizonte)
+        self.alpha = alpha
+        self.aceitacao_inicial = aceitacao_inicial
+        self.aceitacao_final = aceitacao_final
+        self.janela = janela
+        self.iteracoes_reaquecimento = iteracoes_reaquecimento
+        self.fator_reaquecimento = fator_reaquecimento
+        self.T_minimo = T_minimo
+        self.iteracoes = 0
+        self.iteracoes_sem_melhora = 0
+        self.reaquecimentos = 0
+        self.pioras = 0
+        self.pioras_aceitas = 0
+
+    def alvo(self) -> float:
+        """Taxa alvo de aceitação das pioras na iteração corrente."""
+        progresso = min(1.0, self.iteracoes / self.horizonte)
+        return self.aceitacao_inicial * (self.aceitacao_final / self.aceitacao_inicial) ** progresso
+
+    def esfriou(self) -> bool:
+        """Indica que a busca do esquema fixo alcançou a temperatura mínima (o esquema adaptativo termina apenas pelo número de iterações)."""
+        return self.alpha is not None and self.T <= self.T_minimo
+
+    def registrar(self, delta_e: float, aceita: bool, melhorou: bool) -> bool:
+        """Registra o resultado de uma iteração e atualiza a temperatura. Retorna True quando a temperatura é reaquecida, caso em
+        que a busca deve recomeçar da melhor solução."""
+        self.iteracoes += 1
+        if delta_e > 0:
+            self.pioras += 1
+            self.pioras_aceitas += aceita
+        if melhorou:
+            self.iteracoes_sem_melhora = 0
+        else:
+            self.iteracoes_sem_melhora += 1
+
+        if self.iteracoes_reaquecimento is not None and self.iteracoes_sem_melhora >= self.iteracoes_reaquecimento:
+            self.T = min(self.T_inicial, self.fator_reaquecimento * self.T)
+            self.pioras = self.pioras_aceitas = 0
+            self.iteracoes_sem_melhora = 0
+            self.reaquecimentos += 1
+            return True
+
+        if self.alpha is not None:
+            self.T *= self.alpha
+        elif self.pioras >= self.janela:
+            # Com aceitação ~ exp(-delta / T), a temperatura que leva a taxa observada ao alvo é T * ln(taxa) / ln(alvo)
+            limite = 0.5 / self.pioras
+            taxa = min(max(self.pioras_aceitas / self.pioras, limite), 1 - limite)
+            self.T *= min(max(math.log(taxa) / math.log(self.alvo()), 0.5), 2.0)
+            self.pioras = self.pioras_aceitas = 0
+        return False
@@ -1,29 +1,79 @@
+from array import array
 from solver.dados import Dados
 
 class Solucao:
     """Representa uma solução gerada para o problema."""
+    __slots__ = ("dados", "sequencia_veiculo", "sequencia_empilhadeira", "B", "D", "W", "H", "C", "M", "_X", "_S", "_Y", "_Z")
+
     def __init__(self, dados: Dados):
         """
-        Variáveis de Decisão:
-        ---------------------
+        Representação compacta:
+        ------------------------
+        - sequencia_veiculo[k]: Lista com os lotes atendidos pelo veículo 'k', na ordem de atendimento.
+        - sequencia_empilhadeira[e]: Lista com os talhões atendidos pela empilhadeira 'e', na ordem de atendimento.
+        - B[i]: Tempo em que o veículo que atende o lote 'i' chega no lote (em horas).
+        - D[i]: Tempo em que o veículo que atende o lote 'i' começa a ser carregado (em horas).
+        - W[i]: Tempo de espera no talhão do veículo que atende o lote 'i' (em horas).
+        - H[i]: Tempo em que o lote 'i' foi completamente atendido (em horas).
+        - C[a]: Tempo em que a empilhadeira que atende o talhão 'a' começa o atendimento (em horas).
+        - M: Tempo de início do atendimento do último lote, em horas (valor contínuo).
+
+        Variáveis de Decisão (materializadas sob demanda a partir das sequências):
+        ---------------------------------------------------------------------------
         - X[k][i][j]: Variável binária. Indica se o veículo 'k' atende o lote 'j' logo após 'i'.
         - S[k][i]: Variável binária. Indica se o veículo 'k' atende o lote 'i'.
-        - B[k][i]: Tempo em que o veículo 'k' chega no lote 'i' (em horas).
-        - D[k][i]: Tempo em que o veículo 'k' começa a ser carregado com o lote 'i' (em horas).
-        - W[k][i]: Tempo de espera do veículo 'k' no talhão para ser carregado com o lote 'i' (em horas).
-        - H[i]: Tempo em que o lote 'i' foi completamente atendido (em horas).
         - Y[e][a][b]: Variável binária. Indica se a empilhadeira 'e' atende o talhão 'b' logo após 'a'.
         - Z[e][a]: Variável binária. Indica se a empilhadeira 'e' atende o talhão 'a'.
-        - C[e][a]: Tempo em que a empilhadeira 'e' começa a atender o talhão 'a' (em horas).
-        - M: Tempo de início do atendimento do último lote, em horas (valor contínuo).
         """
-        self.X = [[[0 for _ in range(dados.nL + 2)] for _ in range(dados.nL + 2)] for _ in range(dados.nV)]  # aqui entre os lotes virtuais
-        self.S = [[0 for _ in range(dados.nL)] for _ in range(dados.nV)]
-        self.B = [[0 for _ in range(dados.nL)] for _ in range(dados.nV)]
-        self.D = [[0 for _ in range(dados.nL)] for _ in range(dados.nV)] 
-        self.W = [[0 for _ in range(dados.nL)] for _ in range(dados.nV)]
-        self.H = [0 for _ in range(dados.nL)]
-        self.Y = [[[0 for _ in range(dados.nT + 2)] for _ in range(dados.nT + 2)] for _ in range(dados.nE)]
-        self.Z = [[0 for _ in range(dados.nT)] for _ in range(dados.nE)]
-        self.C = [[0.0 for _ in range(dados.nT + 2)] for _ in range(dados.nE)]
-        self.M = 0.0  
\ No newline at end of file
+        self.dados = dados
+        self.sequencia_veiculo = [[] for _ in range(dados.nV)]
+        self.sequencia_empilhadeira = [[] for _ in range(dados.nE)]
+        self.B = array("d", bytes(8 * dados.nL))
+        self.D = array("d", bytes(8 * dados.nL))
+        self.W = array("d", bytes(8 * dados.nL))
+        self.H = array("d", bytes(8 * dados.nL))
+        self.C = array("d", bytes(8 * (dados.nT + 2)))
+        self.M = 0.0
+        self._X = None
+        self._S = None
+        self._Y = None
+        self._Z = None
+
+    @property
+    def X(self) -> list:
+        if self._X is None:
+            nL = self.dados.nL
+            self._X = [[[0 for _ in range(nL + 2)] for _ in range(nL + 2)] for _ in range(self.dados.nV)]  # aqui entre os lotes virtuais
+            for k, sequencia in enumerate(self.sequencia_veiculo):
+                # Os veiculos saem e terminam na garagem
+                for i, j in zip([0] + sequencia, sequencia + [nL + 1]):
+                    self._X[k][i][j] = 1
+        return self._X
+
+    @property
+    def S(self) -> list:
+        if self._S is None:
+            self._S = [[0 for _ in range(self.dados.nL)] for _ in range(self.dados.nV)]
+            for k, sequencia in enumerate(self.sequencia_veiculo):
+                for i in sequencia:
+                    self._S[k][i - 1] = 1
+        return self._S
+
+    @property
+    def Y(self) -> list:
+        if self._Y is None:
+            nT = self.dados.nT
+            self._Y = [[[0 for _ in range(nT + 2)] for _ in range(nT + 2)] for _ in range(self.dados.nE)]
+            for e, sequencia in enumerate(self.sequencia_empilhadeira):
+                for a, b in zip([0] + sequencia, sequencia):
+                    self._Y[e][a][b] = 1
+        return self._Y
+
+    @property
+    def Z(self) -> list:
+        if self._Z is None:
+            self._Z = [[0 for _ in range(self.dados.nT)] for _ in range(self.dados.nE)]
+            for e, sequencia in enumerate(self.sequencia_empilhadeira):
+                for a in sequencia:
+                    self._Z[e][a - 1] = 1
+        return self._Z